@@ -0,0 +1,167 @@
+"""Parses every .sia file under a folder on all cores, to check that a whole
+extracted simatchviewer folder still loads, and what it's made of.
+
+    python -m io_scene_sia.batch <folder>
+
+Runs without Blender, only the format code in core is used.
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from .core import data_types, parse_sia
+
+
+class FileResult:
+    def __init__(self, path: str):
+        self.path = path
+        self.seconds = 0.0
+        self.error: None | str = None
+        self.vertex_flags = 0
+        self.vertices_num = 0
+        self.triangles_num = 0
+        self.mesh_type: None | str = None
+        self.end_kind: None | str = None
+        self.instance_kinds: list[int] = []
+
+
+def find_sia_files(folder: str) -> list[str]:
+    paths = []
+    for root, dirs, files in os.walk(folder):
+        dirs.sort()
+        for file in sorted(files):
+            if os.path.splitext(file)[1] == ".sia":
+                paths.append(os.path.join(root, file))
+    return paths
+
+
+def parse_file(path: str) -> FileResult:
+    result = FileResult(path)
+    start = time.perf_counter()
+    try:
+        model = parse_sia.load(path)
+        result.seconds = time.perf_counter() - start
+
+        result.vertex_flags = model.vertex_flags.number()
+        for mesh in model.meshes:
+            result.vertices_num += mesh.vertices_num
+            result.triangles_num += mesh.triangles_num
+
+        end_kind = getattr(model, "end_kind", None)
+        if end_kind is not None:
+            result.end_kind = end_kind.kind.name
+            if end_kind.kind == data_types.EndKindType.MeshType:
+                result.mesh_type = data_types.text(end_kind.value)
+
+        result.instance_kinds = [instance.kind for instance in model.instances]
+    except Exception as e:
+        result.seconds = time.perf_counter() - start
+        if isinstance(e, parse_sia.SiaParseError):
+            result.error = str(e).replace("\n", " ")
+        else:
+            result.error = "{}: {}".format(type(e).__name__, e)
+    return result
+
+
+def vertex_flags_name(number: int) -> str:
+    flags = data_types.VertexFlags.from_number(number)
+    names = [
+        name for (name, _, _) in data_types.VertexLayout.fields if getattr(flags, name)
+    ]
+    return " ".join(names)
+
+
+def print_counter(title: str, counter: Counter, name=str):
+    print()
+    print(title)
+    for value, count in counter.most_common():
+        print("  {:>8}  {}".format(count, name(value)))
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m io_scene_sia.batch",
+        description="Parses every .sia file in a folder and reports what failed.",
+    )
+    parser.add_argument("folder")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="worker processes, defaults to the number of cores",
+    )
+    parser.add_argument(
+        "-q", "--quiet", action="store_true", help="don't print every file's time"
+    )
+    args = parser.parse_args(args)
+
+    paths = find_sia_files(args.folder)
+    if len(paths) == 0:
+        print("No .sia files found in {}".format(args.folder))
+        return 1
+
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        chunksize = max(1, min(64, len(paths) // (args.jobs * 4)))
+        for result in executor.map(parse_file, paths, chunksize=chunksize):
+            results.append(result)
+            if args.quiet:
+                continue
+            if result.error is not None:
+                print(
+                    "{:>9.2f} ms  {}  FAILED".format(result.seconds * 1000, result.path)
+                )
+            else:
+                print("{:>9.2f} ms  {}".format(result.seconds * 1000, result.path))
+    wall_time = time.perf_counter() - start
+
+    failures = [result for result in results if result.error is not None]
+    parsed = [result for result in results if result.error is None]
+
+    vertex_flags = Counter(result.vertex_flags for result in parsed)
+    mesh_types = Counter(
+        result.mesh_type for result in parsed if result.mesh_type is not None
+    )
+    end_kinds = Counter(result.end_kind for result in parsed)
+    instance_kinds = Counter(
+        kind for result in parsed for kind in result.instance_kinds
+    )
+
+    print_counter("Vertex flags:", vertex_flags, vertex_flags_name)
+    print_counter("Mesh types:", mesh_types)
+    print_counter("End kinds:", end_kinds)
+    print_counter("Instance kinds:", instance_kinds)
+
+    print()
+    print(
+        "{} files, {} failed, {} vertices, {} triangles".format(
+            len(results),
+            len(failures),
+            sum(result.vertices_num for result in parsed),
+            sum(result.triangles_num for result in parsed),
+        )
+    )
+    parse_time = sum(result.seconds for result in results)
+    print(
+        "{:.2f} s wall time, {:.2f} s parsing, {:.2f} files per second".format(
+            wall_time, parse_time, len(results) / wall_time
+        )
+    )
+    if parsed:
+        slowest = max(parsed, key=lambda result: result.seconds)
+        print("Slowest {:.2f} ms {}".format(slowest.seconds * 1000, slowest.path))
+
+    for result in failures:
+        print("FAILED {}: {}".format(result.path, result.error), file=sys.stderr)
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
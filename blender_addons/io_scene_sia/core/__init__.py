@@ -0,0 +1,4 @@
+"""The sia format itself, usable without Blender.
+
+Only depends on the standard library, with NumPy used where it's available.
+"""
@@ -0,0 +1,390 @@
+"""On disk cache of parsed sia files, so files that have been imported
+before don't have to be parsed again.
+
+An entry holds the model's metadata as JSON, followed by each mesh's
+vertex and index data as raw little-endian arrays, which are viewed with
+NumPy when loaded. Entries are keyed by the file's absolute path, size,
+modification time and parse_sia.PARSER_VERSION. ParseCache.evict removes
+the least recently used ones once the cache grows past its size limit.
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import struct
+import tempfile
+import threading
+
+from . import data_types, parse_sia
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MAGIC = b"SIAC"
+# Bump when the layout of an entry changes
+FORMAT_VERSION = 1
+ENTRY_EXTENSION = ".siac"
+
+HEADER = struct.Struct("<4sII")
+
+# Vertex fields kept in the cache, everything else the parser only skips
+VERTEX_FIELDS = {"position": 3, "normal": 3, "uv_set1": 2, "uv_set2": 2}
+
+
+class ParseCache:
+    def __init__(self, directory: str, max_size: int):
+        """max_size is in bytes."""
+        if np is None:
+            raise Exception("The parse cache requires NumPy")
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(directory, exist_ok=True)
+
+    def entry_path(self, path: str) -> str:
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        key = "{}\0{}\0{}\0{}".format(
+            path, stat.st_size, stat.st_mtime_ns, parse_sia.PARSER_VERSION
+        )
+        name = hashlib.sha1(key.encode("utf-8", "surrogateescape")).hexdigest()
+        return os.path.join(self.directory, name + ENTRY_EXTENSION)
+
+    def load(self, path: str, as_arrays=False) -> data_types.Model:
+        """Same as parse_sia.load, but served from the cache when possible."""
+        parse_sia.check_path(path)
+        entry_path = self.entry_path(path)
+        model = self.read(entry_path)
+        if model is None:
+            model = parse_sia.load(path, as_arrays=True)
+            self.store(entry_path, model)
+
+        if not as_arrays:
+            for mesh in model.meshes:
+                arrays_to_objects(mesh)
+        return model
+
+    def open(self, path: str):
+        """Same as parse_sia.LazyModel with as_arrays, but served from the cache
+        when possible. Use it as a context manager.
+
+        When it isn't cached the meshes are still decoded one at a time, and
+        the entry is written once iter_meshes has gone through all of them.
+        """
+        parse_sia.check_path(path)
+        entry_path = self.entry_path(path)
+        model = self.read(entry_path)
+        if model is not None:
+            return contextlib.nullcontext(model)
+        return StoringModel(self, path, entry_path)
+
+    def read(self, entry_path: str) -> None | data_types.Model:
+        try:
+            with open(entry_path, "rb") as file:
+                model = read_entry(file.read())
+            # Marks it as recently used
+            os.utime(entry_path)
+            return model
+        except (OSError, ValueError, KeyError, struct.error):
+            # Missing, or left behind by something that didn't finish writing it
+            return None
+
+    def store(self, entry_path: str, model: data_types.Model):
+        entry = EntryWriter(model)
+        for mesh in model.meshes:
+            entry.add_mesh(mesh)
+        self.store_entry(entry_path, entry)
+
+    def store_entry(self, entry_path: str, entry):
+        """Writes out an EntryWriter. Doesn't evict anything, call evict() once
+        done adding files."""
+        # Written next to the entry and renamed in place, so other Blender
+        # instances and threads never see half an entry.
+        temporary_path = "{}.{}.{}.tmp".format(
+            entry_path, os.getpid(), threading.get_ident()
+        )
+        try:
+            with open(temporary_path, "wb") as file:
+                entry.finish(file)
+            os.replace(temporary_path, entry_path)
+        except OSError as e:
+            print("Couldn't write parse cache entry {}: {}".format(entry_path, e))
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+        finally:
+            entry.close()
+
+    def evict(self):
+        """Removes the least recently used entries until it fits in max_size."""
+        entries = []
+        total_size = 0
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(ENTRY_EXTENSION):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                # Evicted by another thread in the meantime
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+            total_size += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total_size -= size
+
+    def clear(self):
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(ENTRY_EXTENSION):
+                os.remove(entry.path)
+
+
+def to_text(value) -> str:
+    # Latin-1 turns any bytes into text and back unchanged
+    return data_types.text(value, "latin-1")
+
+
+def from_text(text: str):
+    if text == "":
+        return ""
+    return text.encode("latin-1")
+
+
+class StoringModel(parse_sia.LazyModel):
+    """A LazyModel that adds each mesh to a cache entry as iter_meshes decodes
+    it, and stores the entry once all of them are."""
+
+    def __init__(self, parse_cache: ParseCache, path: str, entry_path: str):
+        super().__init__(path, as_arrays=True)
+        self.parse_cache = parse_cache
+        self.entry_path = entry_path
+        # Made up front, before the caller gets a chance to change the model
+        self.entry = EntryWriter(self)
+
+    def iter_meshes(self):
+        # Only the first time through is stored
+        entry, self.entry = self.entry, None
+        for mesh in super().iter_meshes():
+            if entry is not None:
+                entry.add_mesh(mesh)
+            yield mesh
+        if entry is not None:
+            self.parse_cache.store_entry(self.entry_path, entry)
+
+    def close(self):
+        if self.entry is not None:
+            self.entry.close()
+            self.entry = None
+        super().close()
+
+
+class EntryWriter:
+    """Writes an entry one mesh at a time. The metadata comes first in the
+    entry, so the mesh data is kept in a temporary file until finish()."""
+
+    def __init__(self, model):
+        """model is a data_types.Model or parse_sia.LazyModel, its meshes are
+        added with add_mesh."""
+        end_kind = getattr(model, "end_kind", None)
+        if end_kind is not None:
+            end_kind = [int(end_kind.kind), to_text(end_kind.value)]
+
+        bounding_box = model.bounding_box
+        self.metadata = {
+            "name": to_text(model.name),
+            "bounding_box": [
+                bounding_box.min_x,
+                bounding_box.min_y,
+                bounding_box.min_z,
+                bounding_box.max_x,
+                bounding_box.max_y,
+                bounding_box.max_z,
+            ],
+            "vertex_flags": model.vertex_flags.number(),
+            "end_kind": end_kind,
+            "meshes": [],
+            "instances": [
+                {
+                    "kind": instance.kind,
+                    "name": to_text(instance.name),
+                    "path": to_text(instance.path),
+                    "transform": [
+                        [vector.x, vector.y, vector.z]
+                        for vector in (
+                            instance.transform.position,
+                            instance.transform.rotation,
+                            instance.transform.scale,
+                        )
+                    ],
+                    "positions": [
+                        [position.x, position.y, position.z]
+                        for position in instance.positions
+                    ],
+                }
+                for instance in model.instances
+            ],
+        }
+        self.blocks = tempfile.TemporaryFile()
+        self.offset = 0
+
+    def add_block(self, array) -> int:
+        block_offset = self.offset
+        data = array.tobytes()
+        # Keeps every block 4 byte aligned
+        padding = -len(data) % 4
+        self.blocks.write(data + bytes(padding))
+        self.offset += len(data) + padding
+        return block_offset
+
+    def add_mesh(self, mesh: data_types.Mesh):
+        vertices = mesh.arrays.vertices
+        fields = [name for name in VERTEX_FIELDS if name in vertices.dtype.names]
+        packed = np.empty(len(vertices), vertex_dtype(fields))
+        for name in fields:
+            packed[name] = vertices[name]
+
+        self.metadata["meshes"].append(
+            {
+                "id": mesh.id,
+                "vertices_num": mesh.vertices_num,
+                "triangles_num": mesh.triangles_num,
+                "vertex_offset": mesh.vertex_offset,
+                "triangle_offset": mesh.triangle_offset,
+                "materials": [
+                    {
+                        "name": to_text(material.name),
+                        "kind": to_text(material.kind),
+                        "textures": [
+                            [int(texture.kind), to_text(texture.path)]
+                            for texture in material.textures
+                        ],
+                    }
+                    for material in mesh.materials
+                ],
+                "fields": fields,
+                "vertices": self.add_block(packed),
+                "index_type": mesh.arrays.triangles.dtype.str,
+                "triangles": self.add_block(mesh.arrays.triangles),
+            }
+        )
+
+    def finish(self, file):
+        metadata = json.dumps(self.metadata, separators=(",", ":")).encode("utf-8")
+        file.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(metadata)))
+        file.write(metadata)
+        self.blocks.seek(0)
+        shutil.copyfileobj(self.blocks, file)
+
+    def close(self):
+        self.blocks.close()
+
+
+def write_entry(file, model: data_types.Model):
+    entry = EntryWriter(model)
+    try:
+        for mesh in model.meshes:
+            entry.add_mesh(mesh)
+        entry.finish(file)
+    finally:
+        entry.close()
+
+
+def read_entry(data: bytes) -> data_types.Model:
+    magic, version, metadata_size = HEADER.unpack_from(data)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError("Not a parse cache entry")
+    metadata = json.loads(data[HEADER.size : HEADER.size + metadata_size])
+    blocks_start = HEADER.size + metadata_size
+
+    model = data_types.Model()
+    model.name = from_text(metadata["name"])
+    model.bounding_box = data_types.BoundingBox(*metadata["bounding_box"])
+    model.vertex_flags = data_types.VertexFlags.from_number(metadata["vertex_flags"])
+    if metadata["end_kind"] is not None:
+        kind, value = metadata["end_kind"]
+        model.end_kind = data_types.EndKind()
+        model.end_kind.kind = data_types.EndKindType(kind)
+        model.end_kind.value = value if isinstance(value, bool) else from_text(value)
+
+    for mesh_metadata in metadata["meshes"]:
+        mesh = data_types.Mesh()
+        mesh.id = mesh_metadata["id"]
+        mesh.vertices_num = mesh_metadata["vertices_num"]
+        mesh.triangles_num = mesh_metadata["triangles_num"]
+        mesh.vertex_offset = mesh_metadata["vertex_offset"]
+        mesh.triangle_offset = mesh_metadata["triangle_offset"]
+        for material_metadata in mesh_metadata["materials"]:
+            material = data_types.Material(
+                from_text(material_metadata["name"]),
+                from_text(material_metadata["kind"]),
+            )
+            for kind, path in material_metadata["textures"]:
+                material.textures.append(
+                    data_types.Texture(data_types.TextureKind(kind), from_text(path))
+                )
+            material.update_key()
+            mesh.materials.append(material)
+
+        vertices = np.frombuffer(
+            data,
+            vertex_dtype(mesh_metadata["fields"]),
+            mesh.vertices_num,
+            blocks_start + mesh_metadata["vertices"],
+        )
+        triangles = np.frombuffer(
+            data,
+            mesh_metadata["index_type"],
+            mesh.triangles_num * 3,
+            blocks_start + mesh_metadata["triangles"],
+        )
+        mesh.arrays = data_types.MeshArrays(vertices, triangles.reshape(-1, 3))
+        model.meshes.append(mesh)
+
+    for instance_metadata in metadata["instances"]:
+        instance = data_types.Instance()
+        instance.kind = instance_metadata["kind"]
+        instance.name = from_text(instance_metadata["name"])
+        instance.path = from_text(instance_metadata["path"])
+        instance.transform = data_types.Transform(
+            *(data_types.Vector3(*vector) for vector in instance_metadata["transform"])
+        )
+        instance.positions = [
+            data_types.Vector3(*position) for position in instance_metadata["positions"]
+        ]
+        model.instances.append(instance)
+
+    return model
+
+
+def vertex_dtype(fields: list[str]):
+    return np.dtype([(name, "<f4", VERTEX_FIELDS[name]) for name in fields])
+
+
+def arrays_to_objects(mesh: data_types.Mesh):
+    """Fills in vertices and triangles from a mesh loaded as arrays."""
+    Vector2 = data_types.Vector2
+    Vector3 = data_types.Vector3
+    uv_sets = [uv_set.tolist() for uv_set in mesh.arrays.uv_sets]
+    mesh.vertices = [
+        data_types.Vertex(
+            Vector3(*position),
+            Vector3(*normal),
+            [Vector2(*uv_set[index]) for uv_set in uv_sets],
+        )
+        for (index, (position, normal)) in enumerate(
+            zip(mesh.arrays.positions.tolist(), mesh.arrays.normals.tolist())
+        )
+    ]
+    mesh.triangles = [
+        data_types.Triangle(*triangle) for triangle in mesh.arrays.triangles.tolist()
+    ]
+    mesh.arrays = None
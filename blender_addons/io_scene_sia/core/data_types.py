@@ -0,0 +1,564 @@
+import hashlib
+import sys
+from enum import IntEnum
+from struct import Struct
+
+from . import read_utils, write_utils
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class Bitfield:
+    def __init__(self):
+        self.__bits = 0
+
+    @staticmethod
+    def from_number(number: int):
+        bitfield = Bitfield()
+        bitfield.__bits = number
+        return bitfield
+
+    def number(self):
+        return self.__bits
+
+    def __getitem__(self, key: int):
+        return (self.__bits & 1 << key) != 0
+
+    def __setitem__(self, key: int, value: bool):
+        if value:
+            self.__bits |= 1 << key
+        else:
+            self.__bits != 1 << key
+
+
+class VertexFlags:
+    position = True
+    normal = False
+    uv_set1 = False
+    uv_set2 = False
+    unknown = False
+    tangent = False
+    skin = False
+    unknown2 = False
+    unknown3 = False
+    unknown4 = False
+
+    @staticmethod
+    def from_number(number: int):
+        bitfield = Bitfield.from_number(number)
+
+        flags = VertexFlags()
+        flags.position = bitfield[0]
+        flags.normal = bitfield[1]
+        flags.uv_set1 = bitfield[2]
+        flags.uv_set2 = bitfield[3]
+        flags.unknown = bitfield[4]
+        flags.tangent = bitfield[5]
+        flags.skin = bitfield[6]
+        flags.unknown2 = bitfield[7]
+        flags.unknown3 = bitfield[8]
+        flags.unknown4 = bitfield[9]
+
+        return flags
+
+    def number(self):
+        bitfield = Bitfield()
+
+        bitfield[0] = self.position
+        bitfield[1] = self.normal
+        bitfield[2] = self.uv_set1
+        bitfield[3] = self.uv_set2
+        bitfield[4] = self.unknown
+        bitfield[5] = self.tangent
+        bitfield[6] = self.skin
+        bitfield[7] = self.unknown2
+        bitfield[8] = self.unknown3
+        bitfield[9] = self.unknown4
+
+        return bitfield.number()
+
+
+class VertexLayout:
+    """Where each flagged field sits inside a vertex, compiled once per VertexFlags."""
+
+    # Every field the flags can turn on, in file order, with its size in bytes
+    # and the struct format used to decode it. Fields that are only skipped
+    # over when parsing are padding bytes.
+    fields = (
+        ("position", 12, "3f"),
+        ("normal", 12, "3f"),
+        ("uv_set1", 8, "2f"),
+        ("uv_set2", 8, "2f"),
+        ("unknown", 8, "8x"),
+        ("tangent", 16, "16x"),
+        ("skin", 20, "20x"),
+        ("unknown2", 0, ""),
+        ("unknown3", 20, "20x"),
+        ("unknown4", 4, "4x"),
+    )
+
+    __cache = {}
+
+    def __init__(self, vertex_flags: VertexFlags):
+        self.stride = 0
+        # Byte offset of each field within a vertex
+        self.offsets: dict[str, int] = {}
+        # Index of each decoded field's first value within an unpacked row
+        self.values: dict[str, int] = {}
+
+        struct_format = "<"
+        value_count = 0
+        for name, size, field_format in VertexLayout.fields:
+            if not getattr(vertex_flags, name) or size == 0:
+                # Flags without any data, like unknown2
+                continue
+            self.offsets[name] = self.stride
+            self.stride += size
+            struct_format += field_format
+            if not field_format.endswith("x"):
+                self.values[name] = value_count
+                value_count += int(field_format[:-1])
+
+        self.struct = Struct(struct_format)
+        self.__dtype = None
+
+    def dtype(self):
+        """Structured NumPy dtype with one record per vertex."""
+        if self.__dtype is None:
+            names = []
+            formats = []
+            offsets = []
+            for name, shape in (
+                ("position", 3),
+                ("normal", 3),
+                ("uv_set1", 2),
+                ("uv_set2", 2),
+                ("tangent", 3),
+            ):
+                if name in self.offsets:
+                    names.append(name)
+                    formats.append(("<f4", shape))
+                    offsets.append(self.offsets[name])
+            if "skin" in self.offsets:
+                names += ["bones", "weights"]
+                formats += [("u1", 4), ("<f4", 4)]
+                offsets += [self.offsets["skin"], self.offsets["skin"] + 4]
+
+            self.__dtype = np.dtype(
+                {
+                    "names": names,
+                    "formats": formats,
+                    "offsets": offsets,
+                    "itemsize": self.stride,
+                }
+            )
+        return self.__dtype
+
+    @staticmethod
+    def from_flags(vertex_flags: VertexFlags):
+        number = vertex_flags.number()
+        layout = VertexLayout.__cache.get(number)
+        if layout is None:
+            layout = VertexLayout.__cache[number] = VertexLayout(vertex_flags)
+        return layout
+
+
+class BlockLayout:
+    """Where each mesh's data is within the vertex and index blocks, which hold
+    every mesh back to back in the same order as the mesh table.
+
+    Offsets are in bytes from the start of their block, and are what the mesh
+    table's vertex_offset and triangle_offset hold. Indices are 32 bit once
+    there are more than 65535 vertices in total, otherwise 16 bit. When
+    reading, vertices_total_num is the total from the file's header, which
+    decides the index width, otherwise it's the sum of vertices_nums.
+    """
+
+    def __init__(
+        self,
+        vertex_flags: VertexFlags,
+        vertices_nums: list[int],
+        triangles_nums: list[int],
+        vertices_total_num: None | int = None,
+    ):
+        self.vertex_layout = VertexLayout.from_flags(vertex_flags)
+        if vertices_total_num is None:
+            vertices_total_num = sum(vertices_nums)
+        self.vertices_total_num = vertices_total_num
+        self.large_indices = self.vertices_total_num > 65535
+        self.index_size = 4 if self.large_indices else 2
+        self.index_type = "<u4" if self.large_indices else "<u2"
+
+        self.vertex_offsets: list[int] = []
+        self.triangle_offsets: list[int] = []
+        offset = 0
+        for vertices_num in vertices_nums:
+            self.vertex_offsets.append(offset)
+            offset += vertices_num * self.vertex_layout.stride
+        self.vertices_size = offset
+
+        offset = 0
+        for triangles_num in triangles_nums:
+            self.triangle_offsets.append(offset)
+            offset += triangles_num * 3 * self.index_size
+        self.indices_size = offset
+
+    @staticmethod
+    def from_meshes(
+        vertex_flags: VertexFlags,
+        meshes: list["Mesh"],
+        vertices_total_num: None | int = None,
+    ):
+        return BlockLayout(
+            vertex_flags,
+            [mesh.vertices_num for mesh in meshes],
+            [mesh.triangles_num for mesh in meshes],
+            vertices_total_num,
+        )
+
+
+class Model:
+    def __init__(self):
+        self.name = ""
+        self.bounding_box: BoundingBox
+        self.vertex_flags: VertexFlags
+        self.meshes: list[Mesh] = []
+        self.instances: list[Instance] = []
+        self.end_kind: None | EndKind
+
+    def iter_meshes(self):
+        """Same as parse_sia.LazyModel.iter_meshes, for an already parsed model."""
+        yield from self.meshes
+
+
+class ModelInfo:
+    """Everything in a sia file except the vertex and index data,
+    the meshes only have their counts and materials filled in."""
+
+    def __init__(self):
+        self.path = ""
+        self.name = ""
+        self.bounding_box: BoundingBox
+        self.vertex_flags: VertexFlags
+        self.meshes: list[Mesh] = []
+        # Every texture path used by the materials, without duplicates
+        self.textures: list[str] = []
+        self.instances: list[Instance] = []
+        self.end_kind: None | EndKind = None
+
+
+class Instance:
+    def __init__(self):
+        self.kind: int
+        self.name = ""
+        self.path = ""
+        self.transform: Transform
+        self.positions = []
+
+
+class BoundingBox:
+    float_min = sys.float_info.min
+    float_max = sys.float_info.max
+
+    def __init__(
+        self,
+        min_x=float_max,
+        min_y=float_max,
+        min_z=float_max,
+        max_x=float_min,
+        max_y=float_min,
+        max_z=float_min,
+    ):
+        self.min_x = min_x
+        self.min_y = min_y
+        self.min_z = min_z
+        self.max_x = max_x
+        self.max_y = max_y
+        self.max_z = max_z
+
+    def update_with_vector(self, v):
+        self.min_x = min(self.min_x, v.x)
+        self.min_y = min(self.min_y, v.y)
+        self.min_z = min(self.min_z, v.z)
+
+        self.max_x = max(self.max_x, v.x)
+        self.max_y = max(self.max_y, v.y)
+        self.max_z = max(self.max_z, v.z)
+
+    @staticmethod
+    def read_from_file(sia_file):
+        return BoundingBox(*sia_file.unpack(read_utils.BOUNDING_BOX))
+
+    def write(self, file):
+        write_utils.f32(file, self.min_x)
+        write_utils.f32(file, self.min_y)
+        write_utils.f32(file, self.min_z)
+
+        write_utils.f32(file, self.max_x)
+        write_utils.f32(file, self.max_y)
+        write_utils.f32(file, self.max_z)
+
+
+class Mesh:
+    def __init__(self):
+        self.id = 0
+        self.vertices_num = 0
+        self.triangles_num = 0
+        # As written in the mesh table, not used when parsing
+        self.vertex_offset = 0
+        self.triangle_offset = 0
+        self.materials: list[Material] = []
+        self.vertices: list[Vertex] = []
+        self.triangles: list[Triangle] = []
+        # Set instead of vertices and triangles when loaded with as_arrays
+        self.arrays: None | MeshArrays = None
+
+
+class MeshArrays:
+    """A mesh's vertex and index data as NumPy arrays."""
+
+    def __init__(self, vertices, triangles=None):
+        # One record per vertex, see VertexLayout.dtype
+        self.vertices = vertices
+        # (triangles_num, 3) array of vertex indices
+        self.triangles = triangles
+
+    @property
+    def positions(self):
+        return self.vertices["position"]
+
+    @property
+    def normals(self):
+        return self.vertices["normal"]
+
+    @property
+    def uv_sets(self):
+        names = self.vertices.dtype.names
+        if "uv_set1" in names:
+            uv_sets = [self.vertices["uv_set1"]]
+        else:
+            # Same as the parser does for Vertex.texture_coords
+            uv_sets = [np.zeros((len(self.vertices), 2), np.float32)]
+        if "uv_set2" in names:
+            uv_sets.append(self.vertices["uv_set2"])
+        return uv_sets
+
+
+class Vector2:
+    def __init__(self, x=0.0, y=0.0):
+        self.x = x
+        self.y = y
+
+
+def read_vector2(file):
+    return Vector2(*file.unpack(read_utils.VECTOR2))
+
+
+class Vector3:
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        self.x = x
+        self.y = y
+        self.z = z
+
+
+def read_vector3(file):
+    return Vector3(*file.unpack(read_utils.VECTOR3))
+
+
+class Transform:
+    def __init__(self, position: Vector3, rotation: Vector3, scale: Vector3):
+        self.position = position
+        self.rotation = rotation
+        self.scale = scale
+
+
+class Vertex:
+    def __init__(
+        self,
+        position: Vector3,
+        normal: Vector3,
+        texture_coords: list[Vector2],
+        tangent: Vector3 = Vector3(),
+    ):
+        self.position = position
+        self.normal = normal
+        self.texture_coords = texture_coords
+        self.tangent = tangent
+
+
+class Triangle:
+    def __init__(self, i1, i2, i3):
+        self.index1 = i1
+        self.index2 = i2
+        self.index3 = i3
+
+    def max(self):
+        return max(self.index1, self.index2, self.index3)
+
+    @staticmethod
+    def read_u32(file):
+        return Triangle(*file.unpack(read_utils.TRIANGLE_U32))
+
+    @staticmethod
+    def read_u16(file):
+        return Triangle(*file.unpack(read_utils.TRIANGLE_U16))
+
+    def write_u32(self, file):
+        write_utils.u32(file, self.index1)
+        write_utils.u32(file, self.index2)
+        write_utils.u32(file, self.index3)
+
+    def write_u16(self, file):
+        write_utils.u16(file, self.index1)
+        write_utils.u16(file, self.index2)
+        write_utils.u16(file, self.index3)
+
+
+class TextureKind(IntEnum):
+    Albedo = 0
+    RoughnessMetallicAmbientOcclusion = 1
+    Normal = 2
+    Mask = 5
+    Lightmap = 6
+    Flowmap = 7
+
+    @staticmethod
+    def from_u8(u8):
+        for kind in TextureKind:
+            if kind == u8:
+                return kind
+
+        raise Exception("Could not find a texture kind matching number {}".format(u8))
+
+
+class Texture:
+    def __init__(self, kind: TextureKind, path=""):
+        self.kind = kind
+        self.path = path
+
+    def __eq__(self, other):
+        if isinstance(other, Texture):
+            return self.kind == other.kind and self.path == other.path
+
+    def write(self, file):
+        write_utils.u8(file, int(self.kind))
+        write_utils.string(file, self.path)
+
+
+class Material:
+    def __init__(self, name="", kind=""):
+        self.name = name
+        self.kind = kind
+        self.textures: list[Texture] = []
+        self.key: None | str = None
+
+    def update_key(self):
+        """Sets key, which stands for the name, kind and textures, whatever
+        order the textures are in. The parser calls this once the textures
+        are read, so hashing and comparing don't have to build it each time.
+        """
+        parts = [text_bytes(self.name), text_bytes(self.kind)]
+        for texture in sorted(
+            (int(texture.kind), text_bytes(texture.path)) for texture in self.textures
+        ):
+            parts.append(str(texture[0]).encode("ascii") + b":" + texture[1])
+        self.key = sys.intern(hashlib.sha1(b"\0".join(parts)).hexdigest())
+
+    def __hash__(self):
+        if self.key is None:
+            self.update_key()
+        return hash(self.key)
+
+    def __eq__(self, other):
+        if isinstance(other, Material):
+            if self.key is None:
+                self.update_key()
+            if other.key is None:
+                other.update_key()
+            return self.key == other.key
+
+        return False
+
+
+def text(value, encoding="utf-8", errors="replace") -> str:
+    """A string from the parser as str. The parser gives bytes, except for
+    empty strings which are "", and callers decode them in place."""
+    if isinstance(value, bytes):
+        return value.decode(encoding, errors)
+    return value
+
+
+def text_bytes(value) -> bytes:
+    """The bytes written to a file for a string from the parser, whether it's
+    been decoded or not."""
+    return text(value, errors="surrogateescape").encode("utf-8", "surrogateescape")
+
+
+class MeshType(IntEnum):
+    Unknown = 0
+    RenderFlags = 2
+    VariableLength = 8
+    BodyPart = 88
+    RearCap = 152
+    Glasses = 136
+    StadiumRoof = 216
+    PlayerTunnel = 232
+    SideCap = 248
+
+    @staticmethod
+    def from_u8(u8):
+        for mesh_type in MeshType:
+            if mesh_type == u8:
+                return mesh_type
+
+
+class EndKindType(IntEnum):
+    MeshType = 0
+    IsBanner = 1
+    IsCompBanner = 2
+    IsMatchBall = 3
+    IsTeamLogo = 4
+
+
+class EndKind:
+    def __init__(self):
+        self.kind = None
+        self.value = None
+
+    @staticmethod
+    def MeshType(value):
+        result = EndKind()
+        result.kind = EndKindType.MeshType
+        result.value = value
+        return result
+
+    @staticmethod
+    def IsBanner(value):
+        result = EndKind()
+        result.kind = EndKindType.IsBanner
+        result.value = value
+        return result
+
+    @staticmethod
+    def IsCompBanner(value):
+        result = EndKind()
+        result.kind = EndKindType.IsCompBanner
+        result.value = value
+        return result
+
+    @staticmethod
+    def IsMatchBall(value):
+        result = EndKind()
+        result.kind = EndKindType.IsMatchBall
+        result.value = value
+        return result
+
+    @staticmethod
+    def IsTeamLogo(value):
+        result = EndKind()
+        result.kind = EndKindType.IsTeamLogo
+        result.value = value
+        return result
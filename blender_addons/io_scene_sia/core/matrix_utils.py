@@ -0,0 +1,92 @@
+"""The few 4x4 matrix operations the format needs, on row major nested lists,
+matching what mathutils does for them."""
+
+import math
+
+# Single precision epsilon, Blender does this math in floats
+FLT_EPSILON = 1.1920928955078125e-07
+
+
+def identity() -> list[list[float]]:
+    return [[1.0 if row == column else 0.0 for column in range(4)] for row in range(4)]
+
+
+def decompose(matrix: list[list[float]]) -> tuple:
+    """Splits a matrix into location, XYZ euler rotation and scale,
+    like mathutils.Matrix.decompose() followed by to_euler()."""
+    location = (matrix[0][3], matrix[1][3], matrix[2][3])
+
+    columns = [[matrix[row][column] for row in range(3)] for column in range(3)]
+    scale = [math.sqrt(sum(value * value for value in column)) for column in columns]
+    rotation = [
+        [value / length if length != 0.0 else value for value in column]
+        for (column, length) in zip(columns, scale)
+    ]
+
+    # A negative matrix can't be represented by a rotation,
+    # so the scale takes the sign instead.
+    if _determinant(columns) < 0.0:
+        rotation = [[-value for value in column] for column in rotation]
+        scale = [-value for value in scale]
+
+    return (location, _to_euler(rotation), tuple(scale))
+
+
+def _determinant(columns: list[list[float]]) -> float:
+    a, b, c = columns
+    return (
+        a[0] * (b[1] * c[2] - b[2] * c[1])
+        - b[0] * (a[1] * c[2] - a[2] * c[1])
+        + c[0] * (a[1] * b[2] - a[2] * b[1])
+    )
+
+
+def _to_euler(columns: list[list[float]]) -> tuple:
+    # Indexed column first, the same as Blender's mat3_normalized_to_eul2,
+    # picking whichever of the two solutions has the smallest angles.
+    cy = math.hypot(columns[0][0], columns[0][1])
+    if cy > 16.0 * FLT_EPSILON:
+        euler1 = (
+            math.atan2(columns[1][2], columns[2][2]),
+            math.atan2(-columns[0][2], cy),
+            math.atan2(columns[0][1], columns[0][0]),
+        )
+        euler2 = (
+            math.atan2(-columns[1][2], -columns[2][2]),
+            math.atan2(-columns[0][2], -cy),
+            math.atan2(-columns[0][1], -columns[0][0]),
+        )
+        if sum(map(abs, euler1)) > sum(map(abs, euler2)):
+            return euler2
+        return euler1
+
+    return (
+        math.atan2(-columns[2][1], columns[1][1]),
+        math.atan2(-columns[0][2], cy),
+        0.0,
+    )
+
+
+def compose(location, euler, scale) -> list[list[float]]:
+    """The matrix for a location, XYZ euler rotation and scale,
+    like mathutils.Matrix.LocRotScale()."""
+    ci, cj, ch = (math.cos(angle) for angle in euler)
+    si, sj, sh = (math.sin(angle) for angle in euler)
+    cc = ci * ch
+    cs = ci * sh
+    sc = si * ch
+    ss = si * sh
+
+    # The same as Blender's eul_to_mat3
+    rotation = [
+        [cj * ch, sj * sc - cs, sj * cc + ss],
+        [cj * sh, sj * ss + cc, sj * cs - sc],
+        [-sj, cj * si, cj * ci],
+    ]
+
+    matrix = identity()
+    for row in range(3):
+        for column in range(3):
+            matrix[row][column] = rotation[row][column] * scale[column]
+        matrix[row][3] = location[row]
+    return matrix
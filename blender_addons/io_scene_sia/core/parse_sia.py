@@ -0,0 +1,691 @@
+import os
+import pprint
+import math
+import mmap
+import sys
+from array import array
+
+from . import data_types, matrix_utils, read_utils
+
+try:
+    import numpy as np
+except ImportError:
+    # Only needed for load(as_arrays=True), Blender always ships with it.
+    np = None
+
+pp = pprint.PrettyPrinter(indent=4)
+
+# Bump whenever what the parser produces changes, so cached results are redone
+PARSER_VERSION = 1
+
+
+class SiaParseError(Exception):
+    pass
+
+
+def read_header(sia_file):
+    header = sia_file.read(4)
+    if header != b"SHSM":
+        raise SiaParseError("Expexted header SHSM, but found {!r}".format(header))
+
+
+def read_file_end(sia_file, num: int):
+    end = sia_file.read(4)
+    if end != b"EHSM":
+        raise SiaParseError(
+            "Expected EHSM, but found {!r} at file byte position: {} num is {}".format(
+                end, sia_file.tell(), num
+            )
+        )
+
+
+def read_bones(sia_file, number_of_bones: int):
+    # I think this is the "hash" of the rootbone
+    sia_file.u8_array(4)
+
+    # print("bones")
+    # print("Bones at: {}".format(sia_file.tell()))
+    for _ in range(number_of_bones):
+        # These are floats with weights and such
+        sia_file.skip(56)
+
+
+def read_end_kind(sia_file, num: int):
+    kind = sia_file.string_u8_len()
+    if kind == b"mesh_type":
+        mesh_type = data_types.MeshType.from_u8(sia_file.u8())
+        if mesh_type == data_types.MeshType.VariableLength:
+            return data_types.EndKind.MeshType(sia_file.string())
+        elif mesh_type == data_types.MeshType.RenderFlags:
+            sia_file.skip(4)
+            return data_types.EndKind.MeshType(sia_file.string_u8_len())
+        elif mesh_type == data_types.MeshType.BodyPart:
+            return data_types.EndKind.MeshType(sia_file.string_with_length(4))
+        elif mesh_type == data_types.MeshType.RearCap:
+            return data_types.EndKind.MeshType(sia_file.string_with_length(8))
+        elif mesh_type == data_types.MeshType.StadiumRoof:
+            return data_types.EndKind.MeshType(sia_file.string_with_length(12))
+        elif mesh_type == data_types.MeshType.Glasses:
+            return data_types.EndKind.MeshType(sia_file.string_with_length(7))
+        elif mesh_type == data_types.MeshType.PlayerTunnel:
+            return data_types.EndKind.MeshType(sia_file.string_with_length(13))
+        elif mesh_type == data_types.MeshType.SideCap:
+            return data_types.EndKind.MeshType(sia_file.string_with_length(14))
+        elif mesh_type == data_types.MeshType.Unknown:
+            raise SiaParseError(
+                "{} is a unknown mesh type at file byte position: {}".format(
+                    mesh_type, sia_file.tell()
+                )
+            )
+    elif kind == b"is_banner":
+        return data_types.EndKind.IsBanner(sia_file.u8() != 0)
+    elif kind == b"is_comp_banner":
+        return data_types.EndKind.IsCompBanner(sia_file.u8() != 0)
+    elif kind == b"is_match_ball":
+        return data_types.EndKind.IsMatchBall(sia_file.u8() != 0)
+    elif kind == b"is_team_logo":
+        return data_types.EndKind.IsTeamLogo(sia_file.u8() != 0)
+    else:
+        raise SiaParseError(
+            "{} is a unknown kind = {} type at file byte position: {}".format(
+                num, kind, sia_file.tell()
+            )
+        )
+
+
+def read_instance(sia_file) -> data_types.Instance:
+    instance = data_types.Instance()
+
+    instance.kind = sia_file.u32()
+
+    matrix = matrix_utils.identity()
+    matrix[0][3] = sia_file.f32()
+    matrix[1][3] = sia_file.f32()
+    matrix[2][3] = sia_file.f32()
+    matrix[3][3] = sia_file.f32()
+
+    matrix[0][0] = sia_file.f32()
+    matrix[1][0] = sia_file.f32()
+    matrix[2][0] = sia_file.f32()
+
+    matrix[0][1] = sia_file.f32()
+    matrix[1][1] = sia_file.f32()
+    matrix[2][1] = sia_file.f32()
+
+    matrix[0][2] = sia_file.f32()
+    matrix[1][2] = sia_file.f32()
+    matrix[2][2] = sia_file.f32()
+    matrix[3][2] = sia_file.f32()
+
+    (loc, rot, scale) = matrix_utils.decompose(matrix)
+    position = data_types.Vector3(*loc)
+    rotation = data_types.Vector3(*rot)
+    scale = data_types.Vector3(*scale)
+    instance.transform = data_types.Transform(position, rotation, scale)
+
+    # I don't know what these are but they seem to share the same values often
+    sia_file.skip(4 * 6)
+
+    num1 = sia_file.u32()
+    for _ in range(0, num1):
+        for _ in range(0, 4):
+            instance.positions.append(data_types.read_vector3(sia_file))
+
+    instance.name = sia_file.string()
+    instance.path = sia_file.string()
+    return instance
+
+
+def read_vertex(sia_file, vertex_flags) -> data_types.Vertex:
+    texture_coords = []
+    position, normal = (None, None)
+    if vertex_flags.position:
+        position = data_types.read_vector3(sia_file)
+    else:
+        raise SiaParseError("Missing position flag")
+    if vertex_flags.normal:
+        normal = data_types.read_vector3(sia_file)
+    else:
+        raise SiaParseError("Missing normal flag")
+    if vertex_flags.uv_set1:  # First uv set flag
+        texture_coords.append(data_types.read_vector2(sia_file))
+    else:
+        texture_coords.append(data_types.Vector2(0, 0))
+    if vertex_flags.uv_set2:
+        # Lightmap uvs or just the second uv set used for more reasons.
+        texture_coords.append(data_types.read_vector2(sia_file))
+    if vertex_flags.unknown:
+        # print("model.settings[4]: ", sia_file.u8_array(8))
+        sia_file.skip(8)
+    if vertex_flags.tangent:
+        # This is what the shader documentation says
+        # // tangent + uv winding for binormal direction
+        #
+        data_types.read_vector3(sia_file)
+        sia_file.skip(4)
+    if vertex_flags.skin:
+        # I think this is data about what bone it is skinned to and such
+        # I wonder if there are a max of 4 bone influences, so there are 4 u8s telling what bone they're skinned to.
+        for bone_n in range(4):
+            # print(
+            #     "vertex bone influence ",
+            #     bone_n,
+            #     " is bone: ",
+            sia_file.u8()
+            # ,
+            # )
+        for bone_n in range(4):
+            # print(
+            #     "vertex bone influence ",
+            #     bone_n,
+            #     " amount is ",
+            sia_file.f32()
+            # ,
+            # )
+    if vertex_flags.unknown2:
+        # Seems to be lacking any info?
+        pass
+    if vertex_flags.unknown3:
+        # Printed these as floats, they where very small values(pretty much 0), so unsure what this could be.
+        # print("model.settings[8]: ", sia_file.u8_array(20))
+        # Only used on manager files
+        sia_file.skip(20)
+    if vertex_flags.unknown4:
+        # Don't know when this is set, but it only happens in some files.
+        # most of the time it seems to be a 255 byte, but I have seen others as well.
+        # can it be vertex color?
+        # one byte per color plus alpha
+        # print("model.settings[9]: ", sia_file.u8_array(4))
+        # Only used on stadium pieces
+        sia_file.skip(4)
+
+    return data_types.Vertex(position, normal, texture_coords)
+
+
+def read_vertices(sia_file, mesh: data_types.Mesh, layout: data_types.VertexLayout):
+    if mesh.vertices_num == 0:
+        return
+    if "position" not in layout.offsets:
+        raise SiaParseError("Missing position flag")
+    if "normal" not in layout.offsets:
+        raise SiaParseError("Missing normal flag")
+
+    # Position and normal are always the first six values of a row,
+    # followed by whichever uv sets there are.
+    Vertex = data_types.Vertex
+    Vector3 = data_types.Vector3
+    Vector2 = data_types.Vector2
+    uv_set1 = layout.values.get("uv_set1")
+    uv_set2 = layout.values.get("uv_set2")
+    for row in sia_file.iter_unpack(layout.struct, mesh.vertices_num):
+        if uv_set1 is None:
+            texture_coords = [Vector2(0, 0)]
+        else:
+            texture_coords = [Vector2(row[uv_set1], row[uv_set1 + 1])]
+        if uv_set2 is not None:
+            texture_coords.append(Vector2(row[uv_set2], row[uv_set2 + 1]))
+        mesh.vertices.append(
+            Vertex(
+                Vector3(row[0], row[1], row[2]),
+                Vector3(row[3], row[4], row[5]),
+                texture_coords,
+            )
+        )
+
+
+def read_vertex_array(
+    sia_file, mesh: data_types.Mesh, layout: data_types.VertexLayout, copy=False
+):
+    if mesh.vertices_num != 0:
+        if "position" not in layout.offsets:
+            raise SiaParseError("Missing position flag")
+        if "normal" not in layout.offsets:
+            raise SiaParseError("Missing normal flag")
+
+    buffer, offset = sia_file.block(layout.stride * mesh.vertices_num)
+    vertices = np.frombuffer(buffer, layout.dtype(), mesh.vertices_num, offset)
+    return vertices.copy() if copy else vertices
+
+
+def check_triangle_indices(indices, largest: int, mesh: data_types.Mesh, start: int):
+    """Checks a mesh's whole index buffer at once, given its largest index."""
+    if largest <= mesh.vertices_num - 1:
+        return
+
+    # Only go looking for the offending face once we know there is one,
+    # indices are unsigned so there is no lower bound to check.
+    for position, index in enumerate(indices):
+        if index > mesh.vertices_num - 1:
+            break
+    face = position // 3
+    raise SiaParseError(
+        "Face index larger than available vertices\nFace: {}\nFace Index: {}\nVertices Length: {}\n at file byte position: {}".format(
+            face, index, mesh.vertices_num, start + face * 3 * indices.itemsize
+        )
+    )
+
+
+def read_triangles(sia_file, mesh: data_types.Mesh, index_type: str):
+    if mesh.triangles_num == 0:
+        return
+
+    start = sia_file.tell()
+    indices = array(index_type)
+    size = indices.itemsize * mesh.triangles_num * 3
+    buffer, offset = sia_file.block(size)
+    indices.frombytes(buffer[offset : offset + size])
+    if sys.byteorder == "big":
+        indices.byteswap()
+
+    check_triangle_indices(indices, max(indices), mesh, start)
+
+    Triangle = data_types.Triangle
+    index_iter = iter(indices)
+    mesh.triangles = [Triangle(*triangle) for triangle in zip(*[index_iter] * 3)]
+
+
+def read_triangle_array(sia_file, mesh: data_types.Mesh, index_type: str, copy=False):
+    """With copy the result doesn't keep the file's buffer exported, also when
+    a bad index raises."""
+    start = sia_file.tell()
+    index_size = np.dtype(index_type).itemsize
+    buffer, offset = sia_file.block(index_size * mesh.triangles_num * 3)
+    triangles = np.frombuffer(buffer, index_type, mesh.triangles_num * 3, offset)
+    if copy:
+        # Before checking, otherwise the view lives on in the traceback and
+        # a memory map can't be closed.
+        triangles = triangles.copy()
+
+    if mesh.triangles_num != 0:
+        check_triangle_indices(triangles, triangles.max(), mesh, start)
+
+    return triangles.reshape(-1, 3)
+
+
+def read_model_header(sia_file, model: data_types.Model) -> int:
+    """Reads everything up to the vertex block, returns the total vertex count."""
+    read_header(sia_file)
+
+    sia_file.u32()  # Version maybe?
+
+    model.name = sia_file.string()
+
+    # So far these bytes have only been zero, changing them did nothing
+    sia_file.skip(12)
+
+    # This might be some sort of scale, since it tends to resemble
+    # another bouding box value. Maybe sphere radius, I had a look but not sure.
+    sia_file.f32()
+
+    model.bounding_box = data_types.BoundingBox.read_from_file(sia_file)
+
+    objects_num = sia_file.u32()
+
+    for _ in range(objects_num):
+        mesh = data_types.Mesh()
+
+        mesh.vertex_offset = sia_file.u32()
+        mesh.vertices_num = sia_file.u32()
+
+        mesh.triangle_offset = sia_file.u32()
+        # Number of triangles when divided by 3
+        mesh.triangles_num = int(sia_file.u32() / 3)
+
+        mesh.id = sia_file.u32()
+
+        # Been full bytes when I've checked
+        sia_file.skip(8)
+
+        model.meshes.insert(mesh.id, mesh)
+
+    meshes_num = sia_file.u32()
+
+    for mesh_index in range(meshes_num):
+        # Find out what this is.
+        # did read them as floats, made no sense.
+        # almost seems to be a hash or something,
+        # it looks like when the material name is the same, so is this byte sequence.
+        # bits = '{0:08b}'.format(sia_file.u32())
+        sia_file.skip(4)
+
+        # Only observed as zeros
+        sia_file.skip(4)
+        # Only observed as full bytes
+        sia_file.skip(4)
+        # Only observed as zeros
+        sia_file.skip(4)
+
+        mesh = model.meshes[mesh_index]
+        assert mesh is not None
+        material_kind = sia_file.string()
+        materials_num = sia_file.u8()
+
+        # materials_num is more like material variations it seems.
+        # max I've seen is 2, type static and degraded.
+        # I think degraded is more like a flag, which if it has one it will replace "new" in the texture name
+        # with "old" and use that texture
+        for _ in range(materials_num):
+            material = data_types.Material(sia_file.string(), material_kind)
+            texture_num = sia_file.u8()
+            for _ in range(texture_num):
+                texture = data_types.Texture(
+                    data_types.TextureKind.from_u8(sia_file.u8()),
+                    sia_file.string(),
+                )
+                material.textures.append(texture)
+            material.update_key()
+
+            mesh.materials.append(material)
+
+        # I've changed these every which way, and not seen a visual difference
+        sia_file.skip(64)
+
+    vertices_total_num = sia_file.u32()
+
+    # There seems to be only 10 bits checked, so maybe it's a u16 instead,
+    # and the other 16 bits are something else
+    # could any of these be vertex color?, cause that would be handy
+    model.vertex_flags = data_types.VertexFlags.from_number(sia_file.u32())
+
+    return vertices_total_num
+
+
+def read_model_footer(sia_file, model: data_types.Model):
+    """Reads everything after the index block."""
+    is_skinned = sia_file.u32() == 1
+    number_of_bones = sia_file.u32()
+
+    # Could be a bit field, not sure, but makes more sense than magic number
+    # maybe a bit that says if it is a mesh_type of not.
+    # print("Is skinned: ", is_skinned)
+    if is_skinned:
+        # print("Number of bones: ", number_of_bones)
+        read_bones(sia_file, number_of_bones)
+
+    num = sia_file.u8()
+
+    if num == 2:
+        sia_file.skip(16)
+    elif num == 42:
+        model.end_kind = read_end_kind(sia_file, num)
+    elif num is None:
+        raise SiaParseError(
+            "{} type is None at position: {}".format(num, sia_file.tell())
+        )
+
+    number_of_instances = sia_file.u32()
+    for _ in range(0, number_of_instances):
+        instance = read_instance(sia_file)
+        model.instances.append(instance)
+
+    read_file_end(sia_file, num)
+
+
+def read_model(sia_file, as_arrays=False) -> data_types.Model:
+    model = data_types.Model()
+    vertices_total_num = read_model_header(sia_file, model)
+    blocks = data_types.BlockLayout.from_meshes(
+        model.vertex_flags, model.meshes, vertices_total_num
+    )
+
+    if as_arrays:
+        layout = blocks.vertex_layout
+        for mesh in model.meshes:
+            mesh.arrays = data_types.MeshArrays(
+                read_vertex_array(sia_file, mesh, layout)
+            )
+    elif isinstance(sia_file, read_utils.FileReader):
+        for mesh in model.meshes:
+            for _ in range(mesh.vertices_num):
+                mesh.vertices.append(read_vertex(sia_file, model.vertex_flags))
+    else:
+        for mesh in model.meshes:
+            read_vertices(sia_file, mesh, blocks.vertex_layout)
+
+    # This is how many indecies there is,
+    _number_of_triangles = int(sia_file.u32() / 3)
+    if as_arrays:
+        for mesh in model.meshes:
+            mesh.arrays.triangles = read_triangle_array(
+                sia_file, mesh, blocks.index_type
+            )
+    elif not isinstance(sia_file, read_utils.FileReader):
+        index_type = "I" if blocks.large_indices else "H"
+        for mesh in model.meshes:
+            read_triangles(sia_file, mesh, index_type)
+    else:
+        for mesh in model.meshes:
+            for _ in range(mesh.triangles_num):
+                if blocks.large_indices:
+                    triangle = data_types.Triangle.read_u32(sia_file)
+                else:
+                    triangle = data_types.Triangle.read_u16(sia_file)
+
+                if triangle.max() > len(mesh.vertices) - 1:
+                    raise SiaParseError(
+                        "Face index larger than available vertices\nFace Index: {}\nVertices Length: {}\n at file byte position: {}".format(
+                            triangle.max(), len(mesh.vertices), sia_file.tell()
+                        )
+                    )
+
+                mesh.triangles.append(triangle)
+
+    read_model_footer(sia_file, model)
+
+    return model
+
+
+def check_path(path: str):
+    if not os.path.exists(path) or os.path.splitext(path)[1] != ".sia":
+        raise SiaParseError("{} does not exist or is not a valid sia file".format(path))
+
+
+def load(path: str, buffered=True, as_arrays=False):
+    """Parses a sia file into a data_types.Model.
+
+    With as_arrays each mesh gets a data_types.MeshArrays of NumPy views over
+    the file's vertex and index blocks, instead of Vertex and Triangle objects.
+    """
+    check_path(path)
+    if as_arrays and np is None:
+        raise Exception("Loading {} as arrays requires NumPy".format(path))
+
+    with open(path, "rb") as file:
+        if not buffered:
+            # The original reader, one read call per value. Kept around so the
+            # buffered reader can be checked against it.
+            return read_model(read_utils.FileReader(file), as_arrays)
+        data = file.read()
+
+    return read_model(read_utils.BufferReader(data), as_arrays)
+
+
+class LazyMesh:
+    """A mesh from a LazyModel, its vertices and triangles are decoded the first
+    time they're used and kept until release() is called."""
+
+    def __init__(self, model, mesh: data_types.Mesh, vertex_start: int):
+        self.id = mesh.id
+        self.vertices_num = mesh.vertices_num
+        self.triangles_num = mesh.triangles_num
+        self.vertex_offset = mesh.vertex_offset
+        self.triangle_offset = mesh.triangle_offset
+        self.materials = mesh.materials
+        self.vertex_start = vertex_start
+        self.triangle_start = 0
+        self.__model = model
+        self.__mesh = None
+
+    def decode(self) -> data_types.Mesh:
+        if self.__mesh is None:
+            self.__mesh = self.__model.decode_mesh(self)
+        return self.__mesh
+
+    def release(self):
+        self.__mesh = None
+
+    @property
+    def vertices(self) -> list[data_types.Vertex]:
+        return self.decode().vertices
+
+    @property
+    def triangles(self) -> list[data_types.Triangle]:
+        return self.decode().triangles
+
+    @property
+    def arrays(self) -> None | data_types.MeshArrays:
+        return self.decode().arrays
+
+
+class LazyModel:
+    """A memory mapped sia file.
+
+    Only the header, mesh table and materials are parsed up front, the same
+    as a data_types.Model they're available as attributes. Instances and
+    end_kind are parsed the first time they're used, and each mesh in meshes
+    is a LazyMesh. Use it as a context manager, or call close() when done.
+    """
+
+    def __init__(self, path: str, as_arrays=False):
+        check_path(path)
+        if as_arrays and np is None:
+            raise Exception("Loading {} as arrays requires NumPy".format(path))
+
+        self.path = path
+        self.as_arrays = as_arrays
+
+        with open(path, "rb") as file:
+            try:
+                self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise SiaParseError("{} is empty".format(path))
+
+        model = data_types.Model()
+        sia_file = read_utils.BufferReader(self.data)
+        vertices_total_num = read_model_header(sia_file, model)
+
+        self.name = model.name
+        self.bounding_box = model.bounding_box
+        self.vertex_flags = model.vertex_flags
+        self.blocks = data_types.BlockLayout.from_meshes(
+            model.vertex_flags, model.meshes, vertices_total_num
+        )
+        self.layout = self.blocks.vertex_layout
+        self.large_indices = self.blocks.large_indices
+
+        # Worked out from the counts rather than taken from the mesh table,
+        # files written by older versions of the exporter have wrong offsets
+        # in it.
+        vertices_start = sia_file.tell()
+        # Skip the index count
+        triangles_start = vertices_start + self.blocks.vertices_size + 4
+        self.meshes: list[LazyMesh] = []
+        for index, mesh in enumerate(model.meshes):
+            lazy_mesh = LazyMesh(
+                self, mesh, vertices_start + self.blocks.vertex_offsets[index]
+            )
+            lazy_mesh.triangle_start = (
+                triangles_start + self.blocks.triangle_offsets[index]
+            )
+            self.meshes.append(lazy_mesh)
+        self.footer_start = triangles_start + self.blocks.indices_size
+
+        self.__footer = None
+
+    def decode_mesh(self, lazy_mesh: LazyMesh) -> data_types.Mesh:
+        mesh = data_types.Mesh()
+        mesh.id = lazy_mesh.id
+        mesh.vertices_num = lazy_mesh.vertices_num
+        mesh.triangles_num = lazy_mesh.triangles_num
+        mesh.vertex_offset = lazy_mesh.vertex_offset
+        mesh.triangle_offset = lazy_mesh.triangle_offset
+        mesh.materials = lazy_mesh.materials
+
+        vertices = read_utils.BufferReader(self.data, lazy_mesh.vertex_start)
+        triangles = read_utils.BufferReader(self.data, lazy_mesh.triangle_start)
+        if self.as_arrays:
+            # Copied out of the map, so close() doesn't depend on the arrays
+            # having been released.
+            index_type = self.blocks.index_type
+            mesh.arrays = data_types.MeshArrays(
+                read_vertex_array(vertices, mesh, self.layout, copy=True),
+                read_triangle_array(triangles, mesh, index_type, copy=True),
+            )
+        else:
+            read_vertices(vertices, mesh, self.layout)
+            read_triangles(triangles, mesh, "I" if self.large_indices else "H")
+        return mesh
+
+    def iter_meshes(self):
+        """Yields each mesh decoded, releasing it from its LazyMesh so only the
+        caller holds on to it."""
+        for lazy_mesh in self.meshes:
+            mesh = lazy_mesh.decode()
+            lazy_mesh.release()
+            yield mesh
+
+    def __read_footer(self) -> data_types.Model:
+        if self.__footer is None:
+            footer = data_types.Model()
+            read_model_footer(
+                read_utils.BufferReader(self.data, self.footer_start), footer
+            )
+            self.__footer = footer
+        return self.__footer
+
+    @property
+    def instances(self) -> list[data_types.Instance]:
+        return self.__read_footer().instances
+
+    @property
+    def end_kind(self) -> None | data_types.EndKind:
+        return getattr(self.__read_footer(), "end_kind", None)
+
+    def close(self):
+        for mesh in self.meshes:
+            mesh.release()
+        self.data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def scan(path: str) -> data_types.ModelInfo:
+    """Reads what a sia file contains without decoding any vertices or triangles,
+    for when only its names, materials, textures or instances are needed."""
+    info = data_types.ModelInfo()
+    info.path = path
+
+    with LazyModel(path) as model:
+        info.name = model.name
+        info.bounding_box = model.bounding_box
+        info.vertex_flags = model.vertex_flags
+        for lazy_mesh in model.meshes:
+            mesh = data_types.Mesh()
+            mesh.id = lazy_mesh.id
+            mesh.vertices_num = lazy_mesh.vertices_num
+            mesh.triangles_num = lazy_mesh.triangles_num
+            mesh.vertex_offset = lazy_mesh.vertex_offset
+            mesh.triangle_offset = lazy_mesh.triangle_offset
+            mesh.materials = lazy_mesh.materials
+            info.meshes.append(mesh)
+
+            for material in mesh.materials:
+                for texture in material.textures:
+                    if texture.path not in info.textures:
+                        info.textures.append(texture.path)
+
+        info.instances = model.instances
+        info.end_kind = model.end_kind
+
+    return info
+
+
+def iter_meshes(path: str, as_arrays=False):
+    """Yields the meshes of a sia file one at a time, each with its vertices,
+    triangles and materials, without the rest of the file's meshes in memory."""
+    with LazyModel(path, as_arrays) as model:
+        yield from model.iter_meshes()
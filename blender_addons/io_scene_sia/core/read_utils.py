@@ -0,0 +1,179 @@
+from struct import Struct, unpack
+from io import BufferedReader
+
+U32 = Struct('<I')
+U16 = Struct('<H')
+U8 = Struct('<B')
+F32 = Struct('<f')
+VECTOR2 = Struct('<2f')
+VECTOR3 = Struct('<3f')
+BOUNDING_BOX = Struct('<6f')
+TRIANGLE_U16 = Struct('<3H')
+TRIANGLE_U32 = Struct('<3I')
+
+
+def skip(file: BufferedReader, offset: int) -> None:
+    file.seek(offset, 1)
+
+
+def u32(file: BufferedReader) -> int:
+    return unpack('<I', file.read(4))[0]
+
+
+def u16(file: BufferedReader) -> int:
+    return unpack('<H', file.read(2))[0]
+
+def u8_array(file: BufferedReader, amount: int) -> list[int]:
+    values = []
+    for _ in range(amount):
+        values.append(unpack("<B", file.read(1))[0])
+
+    return values
+
+
+def u8(file: BufferedReader) -> int:
+    return unpack('<B', file.read(1))[0]
+
+
+def f32(file: BufferedReader) -> float:
+    return unpack('<f', file.read(4))[0]
+
+
+def string(file: BufferedReader) -> str:
+    length = u32(file)
+    if length == 0:
+        return ""
+    return unpack('<{}s'.format(length), file.read(length))[0]
+
+
+def string_with_length(file: BufferedReader, length: int) -> str:
+    return unpack('<{}s'.format(length), file.read(length))[0]
+
+
+def string_u8_len(file: BufferedReader) -> str:
+    length = u8(file)
+    if length == 0:
+        return ""    
+    return unpack('<{}s'.format(length), file.read(length))[0]
+
+
+class FileReader:
+    """Reads one value at a time from an open file, using the functions above."""
+
+    def __init__(self, file: BufferedReader):
+        self.file = file
+
+    def tell(self) -> int:
+        return self.file.tell()
+
+    def read(self, amount: int) -> bytes:
+        return self.file.read(amount)
+
+    def unpack(self, struct: Struct) -> tuple:
+        return struct.unpack(self.file.read(struct.size))
+
+    def iter_unpack(self, struct: Struct, count: int):
+        return struct.iter_unpack(self.file.read(struct.size * count))
+
+    def block(self, size: int) -> tuple:
+        return (self.file.read(size), 0)
+
+    def skip(self, offset: int) -> None:
+        skip(self.file, offset)
+
+    def u32(self) -> int:
+        return u32(self.file)
+
+    def u16(self) -> int:
+        return u16(self.file)
+
+    def u8_array(self, amount: int) -> list[int]:
+        return u8_array(self.file, amount)
+
+    def u8(self) -> int:
+        return u8(self.file)
+
+    def f32(self) -> float:
+        return f32(self.file)
+
+    def string(self) -> str:
+        return string(self.file)
+
+    def string_with_length(self, length: int) -> str:
+        return string_with_length(self.file, length)
+
+    def string_u8_len(self) -> str:
+        return string_u8_len(self.file)
+
+
+class BufferReader:
+    """Reads values from a buffer holding the whole file, keeping track of the offset itself."""
+
+    def __init__(self, data, pos=0):
+        self.data = data
+        self.pos = pos
+
+    def tell(self) -> int:
+        return self.pos
+
+    def read(self, amount: int) -> bytes:
+        start = self.pos
+        self.pos += amount
+        return self.data[start : self.pos]
+
+    def unpack(self, struct: Struct) -> tuple:
+        values = struct.unpack_from(self.data, self.pos)
+        self.pos += struct.size
+        return values
+
+    def iter_unpack(self, struct: Struct, count: int):
+        start = self.pos
+        self.pos += struct.size * count
+        return struct.iter_unpack(memoryview(self.data)[start : self.pos])
+
+    def block(self, size: int) -> tuple:
+        """Skips over size bytes, returning the buffer and offset they start at."""
+        start = self.pos
+        self.pos += size
+        return (self.data, start)
+
+    def skip(self, offset: int) -> None:
+        self.pos += offset
+
+    def u32(self) -> int:
+        value = U32.unpack_from(self.data, self.pos)[0]
+        self.pos += 4
+        return value
+
+    def u16(self) -> int:
+        value = U16.unpack_from(self.data, self.pos)[0]
+        self.pos += 2
+        return value
+
+    def u8_array(self, amount: int) -> list[int]:
+        return list(self.read(amount))
+
+    def u8(self) -> int:
+        value = U8.unpack_from(self.data, self.pos)[0]
+        self.pos += 1
+        return value
+
+    def f32(self) -> float:
+        value = F32.unpack_from(self.data, self.pos)[0]
+        self.pos += 4
+        return value
+
+    def string(self) -> str:
+        length = self.u32()
+        if length == 0:
+            return ""
+        return self.read(length)
+
+    def string_with_length(self, length: int) -> str:
+        return self.read(length)
+
+    def string_u8_len(self) -> str:
+        length = self.u8()
+        if length == 0:
+            return ""
+        return self.read(length)
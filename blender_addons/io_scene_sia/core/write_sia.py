@@ -0,0 +1,311 @@
+"""Writes sia files, the other way around from parse_sia.
+
+Meshes are written one at a time by SiaWriter, each section put together in
+memory and written with a few large writes. The vertex block is laid out by
+the same data_types.VertexLayout the parser reads it with, so the two can't
+disagree about it.
+"""
+
+import shutil
+import struct
+import tempfile
+
+from . import data_types, matrix_utils
+
+try:
+    import numpy as np
+except ImportError:
+    # Blender always ships with it
+    np = None
+
+U8 = struct.Struct("<B")
+U32 = struct.Struct("<I")
+F32 = struct.Struct("<f")
+BOUNDING_BOX = struct.Struct("<6f")
+MESH_ENTRY = struct.Struct("<5I")
+# Followed by 8 FF bytes
+MESH_ENTRY_SIZE = MESH_ENTRY.size + 8
+# Kind, the matrix, then 6 floats I don't know the meaning of, written as 0
+INSTANCE = struct.Struct("<I14f24x")
+
+
+def material_name_to_hash(name: str) -> list[int]:
+    if name == "STATIC_LIGHTMAPPED":
+        return [19, 7, 70, 230]
+    elif name == "SKIN":
+        return [184, 101, 107, 179]
+    elif name == "MATCH_BALL":
+        return [78, 230, 215, 233]
+    elif name == "ALPHA_TESTED_HAIR":
+        return [234, 235, 234, 197]
+    elif name == "NETTING":
+        return [212, 55, 120, 131]
+    elif name == "BALL":
+        return [100, 19, 143, 180]
+    elif name == "HAIR":
+        return [185, 118, 182, 212]
+    elif name == "LIGHT":
+        return [47, 30, 157, 226]
+    elif name == "SKINNED":
+        return [51, 133, 14, 212]
+    else:  # "static"
+        return [59, 194, 144, 210]
+
+
+def string(value) -> bytes:
+    value = data_types.text_bytes(value)
+    return U32.pack(len(value)) + value
+
+
+def materials(mesh: data_types.Mesh) -> bytearray:
+    # What is this?
+    # almost seems to be a hash or something,
+    # it looks like when the material name is the same, so is this byte sequence.
+    # might be the material type, since they need to be specific values for lighting to work.
+    # or could it be material settings
+    # I don't even think the "material kind" matters, only the hash
+    data = bytearray(material_name_to_hash(data_types.text(mesh.materials[0].kind)))
+
+    data += bytes(4)
+    data += b"\xff" * 4
+    data += bytes(4)
+
+    data += string(mesh.materials[0].kind)
+    data += U8.pack(len(mesh.materials))
+    for material in mesh.materials:
+        data += string(material.name)
+        data += U8.pack(len(material.textures))
+        for texture in material.textures:
+            data += U8.pack(int(texture.kind))
+            data += string(texture.path)
+
+    data += bytes(64)
+    return data
+
+
+def vertex_block(mesh: data_types.Mesh, layout: data_types.VertexLayout):
+    """mesh.arrays.vertices laid out as layout says, fields the mesh doesn't
+    have are left as 0."""
+    data = np.zeros((mesh.vertices_num, layout.stride), np.uint8)
+    if "unknown4" in layout.offsets:
+        # When I've seen this it has been all F's
+        # as mentioned in the parse_sia file, might be vertex color.
+        # although setting them all to zero I could not see a difference
+        offset = layout.offsets["unknown4"]
+        data[:, offset : offset + 4] = 0xFF
+    vertices = data.view(layout.dtype()).reshape(-1)
+
+    source = mesh.arrays.vertices
+    for name in vertices.dtype.names:
+        if name in source.dtype.names:
+            vertices[name] = source[name]
+        elif name == "uv_set2":
+            # Meshes without a second UV map repeat the first one
+            vertices[name] = mesh.arrays.uv_sets[0]
+    return vertices
+
+
+def footer(instances: list[data_types.Instance]) -> bytearray:
+    """Everything after the index block."""
+    # Not skinned, no bones, and no end kind
+    data = bytearray(U32.pack(0) + U32.pack(0) + U8.pack(0))
+
+    data += U32.pack(len(instances))
+    for instance in instances:
+        transform = instance.transform
+        matrix = matrix_utils.compose(
+            (transform.position.x, transform.position.y, transform.position.z),
+            (transform.rotation.x, transform.rotation.y, transform.rotation.z),
+            (transform.scale.x, transform.scale.y, transform.scale.z),
+        )
+        data += INSTANCE.pack(
+            instance.kind,
+            matrix[0][3],
+            matrix[1][3],
+            matrix[2][3],
+            matrix[3][3],
+            matrix[0][0],
+            matrix[1][0],
+            matrix[2][0],
+            matrix[0][1],
+            matrix[1][1],
+            matrix[2][1],
+            matrix[0][2],
+            matrix[1][2],
+            matrix[2][2],
+            matrix[3][2],
+        )
+
+        # Four positions per quad
+        data += U32.pack(len(instance.positions) // 4)
+        positions = [
+            (position.x, position.y, position.z)
+            for position in instance.positions[: len(instance.positions) // 4 * 4]
+        ]
+        data += np.array(positions, "<f4").tobytes()
+
+        data += string(instance.name)
+        data += string(instance.path)
+
+    data += b"EHSM"
+    return data
+
+
+class SiaWriter:
+    """Writes a sia file one mesh at a time, so only the mesh being added has
+    to be in memory.
+
+    The file's sections hold every mesh's data back to back, so vertices and
+    indices are kept in temporary files until finish() copies them in. The
+    bounding box and mesh table come before them, and are filled in once all
+    meshes are added, with offsets from data_types.BlockLayout. file has to be
+    seekable.
+    """
+
+    # How many indices are narrowed to 16 bits at a time
+    CHUNK_SIZE = 1 << 20
+
+    def __init__(
+        self, file, name, meshes_num: int, vertex_flags: data_types.VertexFlags
+    ):
+        if np is None:
+            raise Exception("Writing sia files requires NumPy")
+
+        self.file = file
+        self.meshes_num = meshes_num
+        self.vertex_flags = vertex_flags
+        self.layout = data_types.VertexLayout.from_flags(vertex_flags)
+        self.bounding_box = data_types.BoundingBox()
+        # Each added mesh's vertex count, triangle count and id
+        self.mesh_entries: list[tuple] = []
+        self.vertices_total_num = 0
+        self.triangles_total_num = 0
+        # Written as 32 bit and narrowed at the end if they fit in 16
+        self.vertices = tempfile.TemporaryFile()
+        self.indices = tempfile.TemporaryFile()
+
+        file.write(b"SHSM")
+        file.write(U32.pack(35))
+        file.write(string(name))
+        file.write(bytes(12))
+
+        # Radius and bounding box, then the mesh table, filled in by finish()
+        self.bounds_position = file.tell()
+        file.write(bytes(F32.size + BOUNDING_BOX.size))
+        file.write(U32.pack(meshes_num))
+        self.mesh_table_position = file.tell()
+        file.write(bytes(MESH_ENTRY_SIZE * meshes_num))
+
+        file.write(U32.pack(meshes_num))
+
+    def add_mesh(self, mesh: data_types.Mesh):
+        """Writes mesh, its vertices and triangles are taken from mesh.arrays."""
+        if len(self.mesh_entries) == self.meshes_num:
+            raise Exception("More meshes than the {} given".format(self.meshes_num))
+
+        self.mesh_entries.append((mesh.vertices_num, mesh.triangles_num, mesh.id))
+        self.vertices_total_num += mesh.vertices_num
+        self.triangles_total_num += mesh.triangles_num
+
+        self.file.write(materials(mesh))
+        self.vertices.write(vertex_block(mesh, self.layout).data)
+        self.indices.write(mesh.arrays.triangles.astype("<u4").tobytes())
+
+        positions = mesh.arrays.positions
+        if len(positions) != 0:
+            # TODO: This needs to take the instances into account as well
+            self.bounding_box.update_with_vector(
+                data_types.Vector3(*positions.min(axis=0).tolist())
+            )
+            self.bounding_box.update_with_vector(
+                data_types.Vector3(*positions.max(axis=0).tolist())
+            )
+
+    def finish(self, instances: list[data_types.Instance]):
+        """Writes the vertex and index blocks and everything after them, then
+        fills in what was left out at the start."""
+        if len(self.mesh_entries) != self.meshes_num:
+            raise Exception(
+                "{} meshes were added, but {} were given".format(
+                    len(self.mesh_entries), self.meshes_num
+                )
+            )
+        file = self.file
+        blocks = data_types.BlockLayout(
+            self.vertex_flags,
+            [vertices_num for vertices_num, _, _ in self.mesh_entries],
+            [triangles_num for _, triangles_num, _ in self.mesh_entries],
+            self.vertices_total_num,
+        )
+
+        file.write(U32.pack(self.vertices_total_num))
+        file.write(U32.pack(self.vertex_flags.number()))
+        self.vertices.seek(0)
+        shutil.copyfileobj(self.vertices, file)
+        self.vertices.close()
+
+        file.write(U32.pack(self.triangles_total_num * 3))
+        self.indices.seek(0)
+        if blocks.large_indices:
+            shutil.copyfileobj(self.indices, file)
+        else:
+            while True:
+                chunk = self.indices.read(self.CHUNK_SIZE * 4)
+                if not chunk:
+                    break
+                file.write(
+                    np.frombuffer(chunk, "<u4").astype(blocks.index_type).tobytes()
+                )
+        self.indices.close()
+
+        file.write(footer(instances))
+        end = file.tell()
+
+        bounding_box = self.bounding_box
+        file.seek(self.bounds_position)
+        file.write(
+            F32.pack(
+                max(bounding_box.max_x, max(bounding_box.max_y, bounding_box.max_z))
+            )
+        )
+        file.write(
+            BOUNDING_BOX.pack(
+                bounding_box.min_x,
+                bounding_box.min_y,
+                bounding_box.min_z,
+                bounding_box.max_x,
+                bounding_box.max_y,
+                bounding_box.max_z,
+            )
+        )
+
+        file.seek(self.mesh_table_position)
+        for index, (vertices_num, triangles_num, id) in enumerate(self.mesh_entries):
+            file.write(
+                MESH_ENTRY.pack(
+                    blocks.vertex_offsets[index],
+                    vertices_num,
+                    blocks.triangle_offsets[index],
+                    triangles_num * 3,
+                    id,
+                )
+            )
+            # Setting byte 4 and 8 to 0, made it crash, no noticable difference when changing the others
+            file.write(b"\xff" * 8)
+        file.seek(end)
+
+
+def write(file, model: data_types.Model):
+    """Writes model to file, taking every mesh's vertices and triangles from
+    its data_types.MeshArrays and the vertex layout from model.vertex_flags.
+    The bounding box is worked out from the vertices.
+    """
+    writer = SiaWriter(file, model.name, len(model.meshes), model.vertex_flags)
+    for mesh in model.meshes:
+        writer.add_mesh(mesh)
+    writer.finish(model.instances)
+
+
+def save(path: str, model: data_types.Model):
+    with open(path, "wb") as file:
+        write(file, model)
@@ -2,8 +2,6 @@ from io import BufferedWriter
 from typing import Any
 import bpy
 import mathutils
-from struct import pack
-import bmesh
 import ntpath
 import os
 import sys
@@ -12,34 +10,12 @@ from bpy_extras.io_utils import (
     axis_conversion,
 )
 import pprint
-from . import data_types
-from . import write_utils
+import numpy as np
+from .core import data_types
+from .core import write_sia
 from . import utils
 
 
-def material_name_to_hash(name: str) -> list[int]:
-    if name == "STATIC_LIGHTMAPPED":
-        return [19, 7, 70, 230]
-    elif name == "SKIN":
-        return [184, 101, 107, 179]
-    elif name == "MATCH_BALL":
-        return [78, 230, 215, 233]
-    elif name == "ALPHA_TESTED_HAIR":
-        return [234, 235, 234, 197]
-    elif name == "NETTING":
-        return [212, 55, 120, 131]
-    elif name == "BALL":
-        return [100, 19, 143, 180]
-    elif name == "HAIR":
-        return [185, 118, 182, 212]
-    elif name == "LIGHT":
-        return [47, 30, 157, 226]
-    elif name == "SKINNED":
-        return [51, 133, 14, 212]
-    else:  # "static"
-        return [59, 194, 144, 210]
-
-
 def texture_relative_path(node, addon_preferences) -> str | None:
     texture_path = node.image.filepath_from_user()
 
@@ -79,12 +55,117 @@ def texture_relative_path(node, addon_preferences) -> str | None:
     return relative_path
 
 
-def triangulate(me):
-    bm = bmesh.new()
-    bm.from_mesh(me)
-    bmesh.ops.triangulate(bm, faces=bm.faces)
-    bm.to_mesh(me)
-    bm.free()
+def corner_normals(mesh):
+    normals = np.empty(len(mesh.loops) * 3, np.float32)
+    if hasattr(mesh, "corner_normals"):
+        # Blender 4.1 and later
+        mesh.corner_normals.foreach_get("vector", normals)
+    else:
+        mesh.calc_normals_split()
+        mesh.loops.foreach_get("normal", normals)
+    return normals.reshape(-1, 3)
+
+
+def material_uses_lightmap(material) -> bool:
+    if material is None or material.node_tree is None:
+        return False
+    for node in material.node_tree.nodes:
+        if (
+            node.bl_idname == "ShaderNodeGroup"
+            and node.node_tree is not None
+            and node.node_tree.name.startswith("FM Material")
+        ):
+            links = node.inputs["Lightmap"].links
+            if len(links) > 0 and links[0].from_node.bl_idname == "ShaderNodeTexImage":
+                return True
+    return False
+
+
+def weld_vertices(mesh, matrix) -> data_types.MeshArrays:
+    """Turns the loops of a mesh's triangles into sia vertices, transformed by
+    matrix. Loops of the same vertex with the same normal and first UV become
+    one vertex, and the vertices are in the order they're first used, going
+    through the triangles in order."""
+    loops_num = len(mesh.loops)
+
+    # Triangulated by Blender, without changing the mesh
+    mesh.calc_loop_triangles()
+    loops = np.empty(len(mesh.loop_triangles) * 3, np.int32)
+    mesh.loop_triangles.foreach_get("loops", loops)
+
+    matrix = np.array(matrix, np.float64)
+    rotation = matrix[:3, :3]
+    if np.linalg.det(rotation) < 0.0:
+        # Mirrored, so the winding is flipped to keep the faces pointing out
+        loops = loops.reshape(-1, 3)[:, [0, 2, 1]].ravel()
+
+    positions = np.empty(len(mesh.vertices) * 3, np.float32)
+    mesh.vertices.foreach_get("co", positions)
+    positions = positions.reshape(-1, 3) @ rotation.T + matrix[:3, 3]
+
+    loop_vertices = np.empty(loops_num, np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_vertices)
+    loop_vertices = loop_vertices[loops]
+
+    # Normals go through the inverse transpose, so non-uniform scale doesn't
+    # skew them
+    normals = corner_normals(mesh)[loops] @ np.linalg.inv(rotation)
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    normals = (normals / np.where(lengths == 0.0, 1.0, lengths)).astype(np.float32)
+
+    uv_sets = []
+    for uv_layer in mesh.uv_layers:
+        uvs = np.empty(loops_num * 2, np.float32)
+        uv_layer.uv.foreach_get("vector", uvs)
+        # Flipped in double precision, the same as it was done per loop
+        uvs = uvs.reshape(-1, 2)[loops].astype(np.float64)
+        uvs[:, 1] = (uvs[:, 1] * -1) + 1
+        uv_sets.append(uvs)
+
+    keys = np.empty(
+        len(loops), [("vertex", "<i4"), ("normal", "<f4", 3), ("uv", "<f8", 2)]
+    )
+    keys["vertex"] = loop_vertices
+    # Adding 0 turns -0.0 into 0.0, which are the same key in a dict
+    keys["normal"] = normals + 0.0
+    keys["uv"] = uv_sets[0] + 0.0
+    _, first_loops, loop_indices = np.unique(
+        keys.view("V{}".format(keys.dtype.itemsize)),
+        return_index=True,
+        return_inverse=True,
+    )
+
+    # np.unique sorts them, put them back in the order they're first used
+    order = np.argsort(first_loops, kind="stable")
+    first_loops = first_loops[order]
+    indices = np.empty(len(order), np.int64)
+    indices[order] = np.arange(len(order))
+
+    fields = ["position", "normal", "uv_set1"]
+    if len(uv_sets) > 1:
+        fields.append("uv_set2")
+    vertices = np.empty(
+        len(first_loops),
+        [(name, "<f4", 3 if name in ("position", "normal") else 2) for name in fields],
+    )
+    vertices["position"] = positions[loop_vertices[first_loops]]
+    vertices["normal"] = normals[first_loops]
+    vertices["uv_set1"] = uv_sets[0][first_loops]
+    if len(uv_sets) > 1:
+        vertices["uv_set2"] = uv_sets[1][first_loops]
+
+    triangles = indices[loop_indices.ravel()].reshape(-1, 3)
+    return data_types.MeshArrays(vertices, triangles)
+
+
+def instance_parent(obj):
+    """The closest instance empty obj is parented under, or None."""
+    parent = obj.parent
+    while parent is not None:
+        if parent.type == "EMPTY" and "FM_INSTANCE_KIND" in parent:
+            return parent
+        parent = parent.parent
+    return None
 
 
 def save(
@@ -106,15 +187,16 @@ def save(
     ).to_4x4() @ mathutils.Matrix.Scale(1.0, 4)
 
     model = data_types.Model()
-    model.bounding_box = data_types.BoundingBox()
     model.name = os.path.splitext(os.path.basename(filepath))[0]
 
     valid_objects = []
     instances = []
     instances_positions = {}
-    uses_lightmap = False
 
     for obj in context_objects:
+        if instance_parent(obj) is not None:
+            # Comes from the file an instance refers to, or is one of its quads
+            continue
         if obj.type == "EMPTY":
             if "FM_INSTANCE_KIND" in obj:
                 if obj["FM_INSTANCE_KIND"] == 0:
@@ -122,205 +204,26 @@ def save(
                 else:
                     instances.append(obj)
                     instances_positions[obj] = []
-                    for i, child in enumerate(obj.children):
-                        instances_positions[obj].append([])
+                    # One quad per face, older imports made an object per quad
+                    for child in obj.children:
                         depsgraph = bpy.context.evaluated_depsgraph_get()
                         mesh_owner = child.evaluated_get(depsgraph)
                         mesh = mesh_owner.to_mesh()
                         mat = global_matrix @ child.matrix_world
                         mesh.transform(mat)
-                        for vert in mesh.vertices:
-                            instances_positions[obj][i].append(vert.co)
-        if obj.type not in ["MESH", "CURVE"] or obj.parent in instances:
+                        for polygon in mesh.polygons:
+                            if polygon.loop_total != 4:
+                                continue
+                            instances_positions[obj].extend(
+                                data_types.Vector3(*mesh.vertices[v].co)
+                                for v in polygon.vertices
+                            )
+                        mesh_owner.to_mesh_clear()
+        if obj.type not in ["MESH", "CURVE"]:
             continue
 
         valid_objects.append(obj)
 
-    for mesh_index, obj in enumerate(valid_objects):
-        sia_mesh = data_types.Mesh()
-
-        if obj.mode == "EDIT":
-            obj.update_from_editmode()
-
-        depsgraph = bpy.context.evaluated_depsgraph_get()
-        mesh_owner = obj.evaluated_get(depsgraph)
-
-        mesh = mesh_owner.to_mesh()
-
-        triangulate(mesh)
-
-        mat = global_matrix @ obj.matrix_world
-        mesh.transform(mat)
-        if mat.is_negative:
-            mesh.flip_normals()
-
-        # I don't export tangents for now
-        # mesh.calc_tangents()
-
-        sia_mesh.id = mesh_index
-
-        mesh_verts = mesh.vertices
-        vdict = [{} for i in range(len(mesh_verts))]
-        ply_verts = []
-        ply_faces = [[] for f in range(len(mesh.polygons))]
-        vert_count = 0
-        used_material_indecies = []
-
-        for i, f in enumerate(mesh.polygons):
-            if f.material_index not in used_material_indecies:
-                used_material_indecies.append(f.material_index)
-            # TODO: by checking material_index on f, I'll be able to
-            # split materials into their own meshes.
-            uv = []
-            for uv_layer in mesh.uv_layers:
-                uv.append(
-                    [
-                        uv_layer.uv[loop].vector[:]
-                        for loop in range(f.loop_start, f.loop_start + f.loop_total)
-                    ]
-                )
-            pf = ply_faces[i]
-            normals = []
-            tangents = []
-
-            for li in f.loop_indices:
-                normals.append(mesh.loops[li].normal[:])
-                tangents.append(mesh.loops[li].tangent[:])
-
-            for j, vidx in enumerate(f.vertices):
-                normal = normals[j]
-                tangent = tangents[j]
-                uvcoords = []
-                for uv_point in uv:
-                    uvcoords.append((uv_point[j][0], (uv_point[j][1] * -1) + 1))
-
-                key = normal, uvcoords[0]
-
-                vdict_local = vdict[vidx]
-                pf_vidx = vdict_local.get(key)
-
-                if pf_vidx is None:
-                    pf_vidx = vdict_local[key] = vert_count
-                    ply_verts.append((vidx, normal, uvcoords, tangent))
-                    vert_count += 1
-
-                pf.append(pf_vidx)
-
-        materials = [
-            mat
-            for (index, mat) in enumerate(mesh.materials)
-            if index in used_material_indecies
-        ]
-
-        for material in materials:
-            sia_material = data_types.Material()
-            sia_material.name = material.name
-            sia_material.kind = material.FM_SHADER
-
-            node_tree = material.node_tree
-            texture_map = {}
-            for node in node_tree.nodes:
-                if node.bl_idname == "ShaderNodeOutputMaterial":
-                    surface_input = node.inputs["Surface"]
-                    if surface_input:
-                        if len(surface_input.links) > 0:
-                            input = surface_input.links[0].from_node
-                            if input.bl_idname == "ShaderNodeGroup":
-                                if input.node_tree.name.startswith("FM Material"):
-                                    fm_material = input
-                                    albedo = fm_material.inputs["Albedo"]
-                                    ro_me_ao = fm_material.inputs[
-                                        "Roughness Metallic AO"
-                                    ]
-                                    normal = fm_material.inputs["Normal"]
-                                    mask = fm_material.inputs["Mask"]
-                                    lightmap = fm_material.inputs["Lightmap"]
-
-                                    if len(albedo.links) > 0:
-                                        input_node = albedo.links[0].from_node
-                                        if input_node.bl_idname == "ShaderNodeTexImage":
-                                            relative_path = texture_relative_path(
-                                                input_node, addon_preferences
-                                            )
-                                            if relative_path:
-                                                texture_map[
-                                                    data_types.TextureKind.Albedo
-                                                ] = relative_path
-                                    if len(ro_me_ao.links) > 0:
-                                        input_node = ro_me_ao.links[0].from_node
-                                        if input_node.bl_idname == "ShaderNodeTexImage":
-                                            relative_path = texture_relative_path(
-                                                input_node, addon_preferences
-                                            )
-                                            if relative_path:
-                                                texture_map[
-                                                    data_types.TextureKind.RoughnessMetallicAmbientOcclusion
-                                                ] = relative_path
-                                    if len(normal.links) > 0:
-                                        input_node = normal.links[0].from_node
-                                        if input_node.bl_idname == "ShaderNodeTexImage":
-                                            relative_path = texture_relative_path(
-                                                input_node, addon_preferences
-                                            )
-                                            if relative_path:
-                                                texture_map[
-                                                    data_types.TextureKind.Normal
-                                                ] = relative_path
-                                    if len(mask.links) > 0:
-                                        input_node = mask.links[0].from_node
-                                        if input_node.bl_idname == "ShaderNodeTexImage":
-                                            relative_path = texture_relative_path(
-                                                input_node, addon_preferences
-                                            )
-                                            if relative_path:
-                                                texture_map[
-                                                    data_types.TextureKind.Mask
-                                                ] = relative_path
-                                    if len(lightmap.links) > 0:
-                                        input_node = lightmap.links[0].from_node
-                                        if input_node.bl_idname == "ShaderNodeTexImage":
-                                            relative_path = texture_relative_path(
-                                                input_node, addon_preferences
-                                            )
-                                            if relative_path:
-                                                uses_lightmap = True
-                                                texture_map[
-                                                    data_types.TextureKind.Lightmap
-                                                ] = relative_path
-
-            for kind, path in texture_map.items():
-                sia_texture = data_types.Texture(kind, path)
-                sia_material.textures.append(sia_texture)
-
-            sia_mesh.materials.append(sia_material)
-
-        # TODO: Move this inline into the loop above
-        for index, normal, uv_coords, tangent in ply_verts:
-            vert = mesh_verts[index]
-            uv_sets = []
-            for uv_set in uv_coords:
-                uv_sets.append(data_types.Vector2(*uv_set))
-            vert = data_types.Vertex(
-                data_types.Vector3(*vert.co[:]),
-                data_types.Vector3(*normal),
-                uv_sets,
-                data_types.Vector3(*tangent),
-            )
-            # TODO: This needs to take the instances into account as well
-            model.bounding_box.update_with_vector(vert.position)
-            sia_mesh.vertices.append(vert)
-
-        for pf in ply_faces:
-            sia_mesh.triangles.append(data_types.Triangle(*pf))
-
-        # TODO: These don't need to be fields, it can compute this when writing it.
-        sia_mesh.vertices_num = len(sia_mesh.vertices)
-        sia_mesh.triangles_num = len(sia_mesh.triangles)
-
-        model.meshes.append(sia_mesh)
-
-        mesh_owner.to_mesh_clear()
-
     for instance_obj in instances:
         instance = data_types.Instance()
         instance.kind = instance_obj["FM_INSTANCE_KIND"]
@@ -342,182 +245,162 @@ def save(
             ),
         )
         if instance.kind != 0:
-            for pos in instances_positions[instance_obj]:
-                instance.positions.append(pos)
+            instance.positions = instances_positions[instance_obj]
         model.instances.append(instance)
 
-    if len(model.meshes) == 0:
+    if len(valid_objects) == 0:
         raise Exception("No valid meshes to export")
 
-    with open(filepath, "wb") as file:
-        file.write(b"SHSM")
-
-        file.write(pack("<I", 35))
-
-        write_utils.string(file, model.name)
-
-        write_utils.zeros(file, 12)
-
-        write_utils.f32(
-            file,
-            max(
-                model.bounding_box.max_x,
-                max(model.bounding_box.max_y, model.bounding_box.max_z),
-            ),
-        )
-
-        model.bounding_box.write(file)
-
-        write_utils.u32(file, len(model.meshes))
-
-        vertex_offset = 0
-        triangle_offset = 0
-        for mesh in model.meshes:
-            write_utils.u32(file, vertex_offset)
-            write_utils.u32(file, mesh.vertices_num)
-            vertex_offset += mesh.vertices_num * 96
-
-            write_utils.u32(file, triangle_offset)
-            write_utils.u32(file, mesh.triangles_num * 3)
-            triangle_offset += (mesh.triangles_num * 3) * 2
-
-            write_utils.u32(file, mesh.id)
-            # Setting byte 4 and 8 to 0, made it crash, no noticable difference when changing the others
-            write_utils.full_bytes(file, 8)
-
-        write_utils.u32(file, len(model.meshes))
-
-        for mesh in model.meshes:
-            # What is this?
-            # almost seems to be a hash or something,
-            # it looks like when the material name is the same, so is this byte sequence.
-            # might be the material type, since they need to be specific values for lighting to work.
-            # or could it be material settings
-            # I don't even think the "material kind" matters, only the hash
-
-            for byte in material_name_to_hash(mesh.materials[0].kind):
-                write_utils.u8(file, byte)
-
-            write_utils.zeros(file, 4)
-            write_utils.full_bytes(file, 4)
-            write_utils.zeros(file, 4)
-
-            write_utils.string(file, mesh.materials[0].kind)
-            write_utils.u8(file, len(mesh.materials))
-            for material in mesh.materials:
-                write_utils.string(file, material.name)
-                write_utils.u8(file, len(material.textures))
-                for texture in material.textures:
-                    texture.write(file)
-
-            write_utils.zeros(file, 64)
-
-        vertices_total_num = 0
-        number_of_triangles = 0
-        for mesh in model.meshes:
-            vertices_total_num += mesh.vertices_num
-            number_of_triangles += mesh.triangles_num
-
-        write_utils.u32(file, vertices_total_num)
-
-        model.vertex_flags = data_types.VertexFlags()
-        model.vertex_flags.normal = True
-        model.vertex_flags.uv_set1 = True
-        if uses_lightmap:
-            model.vertex_flags.uv_set2 = True
-        write_utils.u32(file, model.vertex_flags.number())
-
-        for mesh in model.meshes:
-            for vert in mesh.vertices:
-                if model.vertex_flags.position:
-                    write_utils.vector3(file, vert.position)
-                if model.vertex_flags.normal:
-                    write_utils.vector3(file, vert.normal)
-                if model.vertex_flags.uv_set1:
-                    write_utils.vector2(file, vert.texture_coords[0])
-                if model.vertex_flags.uv_set2:
-                    if len(vert.texture_coords) == 1:
-                        write_utils.vector2(file, vert.texture_coords[0])
-                    else:
-                        write_utils.vector2(file, vert.texture_coords[1])
-                if model.vertex_flags.unknown4:
-                    # When I've seen this it has been all F's
-                    # as mentioned in the parse_sia file, might be vertex color.
-                    # although setting them all to zero I could not see a difference
-                    write_utils.full_bytes(file, 4)
-
-        write_utils.u32(file, number_of_triangles * 3)
-
-        for mesh in model.meshes:
-            for triangle in mesh.triangles:
-                if vertices_total_num > 65535:
-                    triangle.write_u32(file)
-                else:
-                    triangle.write_u16(file)
-
-        write_utils.u32(file, 0)
-        write_utils.u32(file, 0)
-        write_utils.u8(file, 0)
-        write_utils.u32(file, len(model.instances))
-        for instance in model.instances:
-            write_utils.u32(file, instance.kind)
-            matrix = mathutils.Matrix.LocRotScale(
-                mathutils.Vector(
-                    (
-                        instance.transform.position.x,
-                        instance.transform.position.y,
-                        instance.transform.position.z,
-                    )
-                ),
-                mathutils.Euler(
-                    (
-                        instance.transform.rotation.x,
-                        instance.transform.rotation.y,
-                        instance.transform.rotation.z,
-                    )
-                ),
-                mathutils.Vector(
-                    (
-                        instance.transform.scale.x,
-                        instance.transform.scale.y,
-                        instance.transform.scale.z,
-                    )
-                ),
+    # Needed before the first vertex is written
+    model.vertex_flags = data_types.VertexFlags()
+    model.vertex_flags.normal = True
+    model.vertex_flags.uv_set1 = True
+    if any(
+        material_uses_lightmap(slot.material)
+        for obj in valid_objects
+        for slot in obj.material_slots
+    ):
+        model.vertex_flags.uv_set2 = True
+
+    # Each mesh is written out as soon as it's converted, so only one is
+    # held in memory at a time. That happens next to the target and is renamed
+    # over it at the end, so a mesh that can't be exported doesn't wipe out an
+    # earlier export, or leave half a file behind.
+    temporary_path = "{}.{}.tmp".format(filepath, os.getpid())
+    try:
+        with open(temporary_path, "wb") as file:
+            writer = write_sia.SiaWriter(
+                file, model.name, len(valid_objects), model.vertex_flags
             )
+            for mesh_index, obj in enumerate(valid_objects):
+                writer.add_mesh(
+                    export_mesh(obj, mesh_index, global_matrix, addon_preferences)
+                )
+            writer.finish(model.instances)
+        os.replace(temporary_path, filepath)
+    finally:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
 
-            write_utils.f32(file, matrix[0][3])
-            write_utils.f32(file, matrix[1][3])
-            write_utils.f32(file, matrix[2][3])
-            write_utils.f32(file, matrix[3][3])
+    return {"FINISHED"}
 
-            write_utils.f32(file, matrix[0][0])
-            write_utils.f32(file, matrix[1][0])
-            write_utils.f32(file, matrix[2][0])
 
-            write_utils.f32(file, matrix[0][1])
-            write_utils.f32(file, matrix[1][1])
-            write_utils.f32(file, matrix[2][1])
+def export_mesh(obj, mesh_index, global_matrix, addon_preferences) -> data_types.Mesh:
+    sia_mesh = data_types.Mesh()
 
-            write_utils.f32(file, matrix[0][2])
-            write_utils.f32(file, matrix[1][2])
-            write_utils.f32(file, matrix[2][2])
-            write_utils.f32(file, matrix[3][2])
+    if obj.mode == "EDIT":
+        obj.update_from_editmode()
 
-            for _ in range(6):
-                write_utils.f32(file, 0)
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    mesh_owner = obj.evaluated_get(depsgraph)
 
-            write_utils.u32(file, len(instance.positions))
-            for i in instance.positions:
-                for pos in i:
-                    write_utils.f32(file, pos[0])
-                    write_utils.f32(file, pos[1])
-                    write_utils.f32(file, pos[2])
+    mesh = mesh_owner.to_mesh()
 
-            write_utils.string(file, instance.name)
-            write_utils.string(file, instance.path)
+    mat = global_matrix @ obj.matrix_world
 
-        file.write(b"EHSM")
+    # I don't export tangents for now
+    # mesh.calc_tangents()
 
-        return {"FINISHED"}
+    sia_mesh.id = mesh_index
 
-    return {"CANCELED"}
+    if len(mesh.uv_layers) == 0:
+        raise Exception(
+            "{} has no UV map, every exported mesh needs one".format(obj.name)
+        )
+    sia_mesh.arrays = weld_vertices(mesh, mat)
+
+    material_indices = np.empty(len(mesh.polygons), np.int32)
+    mesh.polygons.foreach_get("material_index", material_indices)
+    used_material_indecies = set(np.unique(material_indices).tolist())
+
+    materials = [
+        mat
+        for (index, mat) in enumerate(mesh.materials)
+        if index in used_material_indecies
+    ]
+
+    for material in materials:
+        sia_material = data_types.Material()
+        sia_material.name = material.name
+        sia_material.kind = material.FM_SHADER
+
+        node_tree = material.node_tree
+        texture_map = {}
+        for node in node_tree.nodes:
+            if node.bl_idname == "ShaderNodeOutputMaterial":
+                surface_input = node.inputs["Surface"]
+                if surface_input:
+                    if len(surface_input.links) > 0:
+                        input = surface_input.links[0].from_node
+                        if input.bl_idname == "ShaderNodeGroup":
+                            if input.node_tree.name.startswith("FM Material"):
+                                fm_material = input
+                                albedo = fm_material.inputs["Albedo"]
+                                ro_me_ao = fm_material.inputs["Roughness Metallic AO"]
+                                normal = fm_material.inputs["Normal"]
+                                mask = fm_material.inputs["Mask"]
+                                lightmap = fm_material.inputs["Lightmap"]
+
+                                if len(albedo.links) > 0:
+                                    input_node = albedo.links[0].from_node
+                                    if input_node.bl_idname == "ShaderNodeTexImage":
+                                        relative_path = texture_relative_path(
+                                            input_node, addon_preferences
+                                        )
+                                        if relative_path:
+                                            texture_map[
+                                                data_types.TextureKind.Albedo
+                                            ] = relative_path
+                                if len(ro_me_ao.links) > 0:
+                                    input_node = ro_me_ao.links[0].from_node
+                                    if input_node.bl_idname == "ShaderNodeTexImage":
+                                        relative_path = texture_relative_path(
+                                            input_node, addon_preferences
+                                        )
+                                        if relative_path:
+                                            texture_map[
+                                                data_types.TextureKind.RoughnessMetallicAmbientOcclusion
+                                            ] = relative_path
+                                if len(normal.links) > 0:
+                                    input_node = normal.links[0].from_node
+                                    if input_node.bl_idname == "ShaderNodeTexImage":
+                                        relative_path = texture_relative_path(
+                                            input_node, addon_preferences
+                                        )
+                                        if relative_path:
+                                            texture_map[
+                                                data_types.TextureKind.Normal
+                                            ] = relative_path
+                                if len(mask.links) > 0:
+                                    input_node = mask.links[0].from_node
+                                    if input_node.bl_idname == "ShaderNodeTexImage":
+                                        relative_path = texture_relative_path(
+                                            input_node, addon_preferences
+                                        )
+                                        if relative_path:
+                                            texture_map[data_types.TextureKind.Mask] = (
+                                                relative_path
+                                            )
+                                if len(lightmap.links) > 0:
+                                    input_node = lightmap.links[0].from_node
+                                    if input_node.bl_idname == "ShaderNodeTexImage":
+                                        relative_path = texture_relative_path(
+                                            input_node, addon_preferences
+                                        )
+                                        if relative_path:
+                                            texture_map[
+                                                data_types.TextureKind.Lightmap
+                                            ] = relative_path
+
+        for kind, path in texture_map.items():
+            sia_texture = data_types.Texture(kind, path)
+            sia_material.textures.append(sia_texture)
+
+        sia_mesh.materials.append(sia_material)
+
+    # TODO: These don't need to be fields, it can compute this when writing it.
+    sia_mesh.vertices_num = len(sia_mesh.arrays.vertices)
+    sia_mesh.triangles_num = len(sia_mesh.arrays.triangles)
+
+    mesh_owner.to_mesh_clear()
+    return sia_mesh
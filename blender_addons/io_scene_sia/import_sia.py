@@ -1,40 +1,105 @@
+import contextlib
 import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-import bmesh
 import bpy
+import numpy as np
 from bpy_extras import node_shader_utils
 from bpy_extras.image_utils import load_image
-from . import data_types, material_kind_to_enum, parse_sia, utils
+from . import material_kind_to_enum, utils
+from .core import cache, data_types, parse_sia
+
+# How many levels of instances inside instanced files are followed
+MAX_INSTANCE_DEPTH = 8
+# How many instanced files are parsed ahead of being imported
+MAX_PREFETCHED_FILES = 4
 
 
 def load(
     context,
     filepath,
     addon_preferences,
+    use_custom_normals=True,
 ):
     fm_material = add_material_group()
 
-    sia_file = parse_sia.load(filepath)
-    sia_file.name = sia_file.name.decode("utf-8", "replace")
-
     view_layer = context.view_layer
     collection = view_layer.active_layer_collection.collection
 
-    root = bpy.data.objects.new(sia_file.name, None)
-    collection.objects.link(root)
-
-    materials = {}
-
-    for mesh in sia_file.meshes:
-        me = import_mesh(addon_preferences, fm_material, sia_file, materials, mesh)
+    materials = existing_materials()
+    parse_cache = open_parse_cache(addon_preferences)
+    # Each folder is indexed once, instead of checking every path on disk
+    mesh_assets = utils.AssetResolver(
+        [
+            addon_preferences.base_extracted_meshes_path,
+            addon_preferences.base_meshes_path,
+        ]
+    )
+    images = ImageManager(
+        utils.AssetResolver(
+            [
+                addon_preferences.base_extracted_textures_path,
+                addon_preferences.base_textures_path,
+            ]
+        )
+    )
 
-        obj = bpy.data.objects.new(me.name, me)
-        obj.parent = root
-        collection.objects.link(obj)
+    # Blender meshes made for each instanced file during this import,
+    # so every instance of the same file links the same mesh data.
+    instance_meshes = {}
 
-    instance: data_types.Instance
-    for instance in sia_file.instances:
-        load_instance(context, addon_preferences, fm_material, materials, instance)
+    prefetcher = InstancePrefetcher(
+        addon_preferences.base_extracted_meshes_path, mesh_assets, parse_cache
+    )
+    try:
+        with open_model(filepath, parse_cache) as sia_file:
+            sia_file.name = data_types.text(sia_file.name)
+
+            root = bpy.data.objects.new(sia_file.name, None)
+            collection.objects.link(root)
+
+            # Instanced files are parsed while this file's meshes are made
+            instances = sia_file.instances
+            prefetcher.release(os.path.abspath(filepath))
+            prefetcher.request(instances, 1)
+
+            # The next mesh is decoded on a worker thread, while Blender makes
+            # the one before it.
+            with contextlib.closing(utils.read_ahead(sia_file.iter_meshes())) as meshes:
+                for mesh in meshes:
+                    me = import_mesh(
+                        images,
+                        fm_material,
+                        sia_file,
+                        materials,
+                        mesh,
+                        use_custom_normals,
+                    )
+
+                    obj = bpy.data.objects.new(me.name, me)
+                    obj.parent = root
+                    collection.objects.link(obj)
+
+        instance: data_types.Instance
+        for instance in instances:
+            load_instance(
+                context,
+                images,
+                fm_material,
+                materials,
+                prefetcher,
+                instance_meshes,
+                instance,
+                use_custom_normals,
+                ancestors=(os.path.normcase(os.path.abspath(filepath)),),
+            )
+    finally:
+        prefetcher.close()
+        if parse_cache is not None:
+            # Once for everything this import added
+            parse_cache.evict()
 
     view_layer.objects.active = root
 
@@ -42,6 +107,175 @@ def load(
     return {"FINISHED"}
 
 
+def open_parse_cache(addon_preferences):
+    if addon_preferences.cache_size == 0:
+        return None
+
+    cache_path = bpy.path.abspath(addon_preferences.cache_path)
+    if cache_path == "":
+        cache_path = os.path.join(tempfile.gettempdir(), "io_scene_sia_cache")
+    return cache.ParseCache(cache_path, addon_preferences.cache_size * 1024 * 1024)
+
+
+def open_model(path, parse_cache):
+    # Meshes are decoded one at a time, and let go of once they're in Blender
+    if parse_cache is not None:
+        return parse_cache.open(path)
+    return parse_sia.LazyModel(path, as_arrays=True)
+
+
+def instance_file_path(base_meshes_path: str, mesh_assets, relative_path: str):
+    instance_path = mesh_assets.find(relative_path, [".sia"])
+    if instance_path is None:
+        # Doesn't exist, but still tells where it was looked for
+        instance_path = utils.absolute_asset_path(base_meshes_path, relative_path)
+    return instance_path
+
+
+class InstancePrefetcher:
+    """Finds and parses instanced files on worker threads, while the main
+    thread builds the Blender objects for the ones that are already done.
+
+    Parsing a file requests the files its own instances point at, so the
+    whole tree of instanced files is read ahead, down to MAX_INSTANCE_DEPTH.
+    Each file is only parsed once, however often it's referenced, and only
+    MAX_PREFETCHED_FILES are parsed ahead of the main thread.
+    """
+
+    def __init__(self, base_meshes_path: str, mesh_assets, parse_cache):
+        # A plain string, the workers mustn't touch Blender data like the
+        # addon preferences
+        self.base_meshes_path = base_meshes_path
+        self.mesh_assets = mesh_assets
+        self.parse_cache = parse_cache
+        self.executor = ThreadPoolExecutor(max_workers=MAX_PREFETCHED_FILES)
+        self.lock = threading.Lock()
+        self.paths = {}
+        # Files being parsed or parsed and waiting for get(), at most
+        # MAX_PREFETCHED_FILES so they don't all sit in memory at once
+        self.futures = {}
+        # Requested files waiting for room in futures
+        self.queued = {}
+        self.released = set()
+
+    def path(self, relative_path) -> str:
+        # Workers see the parser's bytes, the main thread decoded text
+        relative_path = data_types.text(relative_path)
+        with self.lock:
+            path = self.paths.get(relative_path)
+        if path is None:
+            path = instance_file_path(
+                self.base_meshes_path, self.mesh_assets, relative_path
+            )
+            with self.lock:
+                self.paths[relative_path] = path
+        return path
+
+    def request(self, instances, depth: int):
+        if depth > MAX_INSTANCE_DEPTH:
+            return
+        for instance in instances:
+            if instance.kind != 0:
+                continue
+            path = self.path(instance.path)
+            key = os.path.normcase(path)
+            with self.lock:
+                if key in self.futures or key in self.queued or key in self.released:
+                    continue
+                self.queued[key] = (path, depth)
+        self.submit_queued()
+
+    def submit_queued(self):
+        """Starts parsing queued files, in the order they were requested, while
+        there's room for them."""
+        with self.lock:
+            while self.queued and len(self.futures) < MAX_PREFETCHED_FILES:
+                key = next(iter(self.queued))
+                path, depth = self.queued.pop(key)
+                self.futures[key] = self.executor.submit(self.parse, path, depth)
+
+    def parse(self, path: str, depth: int):
+        if not os.path.exists(path):
+            return None
+        if self.parse_cache is not None:
+            model = self.parse_cache.load(path, as_arrays=True)
+        else:
+            model = parse_sia.load(path, as_arrays=True)
+        self.request(model.instances, depth + 1)
+        return model
+
+    def get(self, path: str, depth: int):
+        """Waits for path to be parsed, None if the file doesn't exist. The
+        caller owns the result, the prefetcher lets go of it."""
+        key = os.path.normcase(path)
+        with self.lock:
+            future = self.futures.pop(key, None)
+            self.queued.pop(key, None)
+            # So it isn't parsed again when a later file references it
+            self.released.add(key)
+        # Makes room for the next queued file
+        self.submit_queued()
+        if future is None:
+            # Not started yet, quicker than waiting behind the queue
+            return self.parse(path, depth)
+        return future.result()
+
+    def release(self, path: str):
+        """Tells the prefetcher path won't be asked for, like the file being
+        imported, so it doesn't take up room."""
+        key = os.path.normcase(path)
+        with self.lock:
+            self.queued.pop(key, None)
+            self.released.add(key)
+
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+class ImageManager:
+    """Finds the texture files materials use, and makes a Blender image for
+    each file once, however many materials use it. Images already in the
+    blend file are reused.
+    """
+
+    def __init__(self, texture_assets):
+        self.texture_assets = texture_assets
+        self.images = {}
+        for image in bpy.data.images:
+            if image.source == "FILE" and image.filepath != "":
+                self.images[self.key(bpy.path.abspath(image.filepath))] = image
+
+    @staticmethod
+    def key(path):
+        return os.path.normcase(os.path.abspath(path))
+
+    def find(self, relative_path):
+        """The texture file for a path in a material, None if there isn't one."""
+        return self.texture_assets.find(
+            relative_path,
+            [".dds", os.path.splitext(relative_path)[1]],
+        )
+
+    def load(self, path):
+        key = self.key(path)
+        image = self.images.get(key)
+        if image is None:
+            image = bpy.data.images.load(path)
+            self.images[key] = image
+        return image
+
+
+def existing_materials():
+    """Materials made by earlier imports by their material key, so importing
+    the same materials again reuses them instead of making duplicates."""
+    materials = {}
+    for material in bpy.data.materials:
+        key = material.get("FM_MATERIAL_KEY")
+        if isinstance(key, str):
+            materials.setdefault(key, material)
+    return materials
+
+
 def add_material_group():
     node_group_name = "FM Material v1.1"
     fm_material_path = os.path.realpath(__file__)
@@ -69,33 +303,26 @@ def add_material_group():
 
 # TODO: Maybe this could be renamed to something more fitting, cause only one of these are actual instances.
 def load_instance(
-    context, addon_preferences, fm_material, materials, instance: data_types.Instance
+    context,
+    images,
+    fm_material,
+    materials,
+    prefetcher,
+    instance_meshes,
+    instance: data_types.Instance,
+    use_custom_normals=True,
+    parent=None,
+    ancestors=(),
+    depth=1,
 ):
     view_layer = context.view_layer
     collection = view_layer.active_layer_collection.collection
 
-    if type(instance.path) is bytes:
-        instance.path = instance.path.decode("utf-8", "replace")
-    if type(instance.name) is bytes:
-        instance.name = instance.name.decode("utf-8", "replace")
-    instance_path = utils.absolute_asset_path(
-        addon_preferences.base_extracted_meshes_path,
-        instance.path,
-    )
-    alternative_instance_path = utils.absolute_asset_path(
-        addon_preferences.base_meshes_path,
-        instance.path,
-    )
-    instance_base = os.path.splitext(instance_path)[0]
-    alternative_instance_base = os.path.splitext(alternative_instance_path)[0]
-
-    ext = ".sia"
-    if os.path.exists(instance_base + ext):
-        instance_path = instance_base + ext
-    elif os.path.exists(alternative_instance_base + ext):
-        instance_path = alternative_instance_base + ext
+    instance.path = data_types.text(instance.path)
+    instance.name = data_types.text(instance.name)
 
     root = bpy.data.objects.new(instance.name, None)
+    root.parent = parent
     collection.objects.link(root)
     root.location.x = instance.transform.position.x
     root.location.y = instance.transform.position.y
@@ -107,95 +334,148 @@ def load_instance(
     root.scale.y = instance.transform.scale.y
     root.scale.z = instance.transform.scale.z
     if instance.kind == 0:
-        if os.path.exists(instance_path):
-            sia_file = parse_sia.load(instance_path)
-            sia_file.name = sia_file.name.decode("utf-8", "replace")
-            for mesh in sia_file.meshes:
-                me = import_mesh(
-                    addon_preferences, fm_material, sia_file, materials, mesh
-                )
-
+        instance_path = prefetcher.path(instance.path)
+        instance_key = os.path.normcase(instance_path)
+        if instance_key in ancestors:
+            print("Skipping instance of {} inside itself".format(instance_path))
+            instance_key = None
+        elif instance_key in instance_meshes:
+            # Already imported for an earlier instance, share its mesh data
+            for me in instance_meshes[instance_key][0]:
                 obj = bpy.data.objects.new(me.name, me)
                 obj.parent = root
 
                 collection.objects.link(obj)
         else:
-            print("Couldn't not load ", instance_path)
+            sia_file = prefetcher.get(instance_path, depth)
+            if sia_file is None:
+                print("Couldn't not load ", instance_path)
+                instance_key = None
+            else:
+                meshes = []
+                sia_file.name = data_types.text(sia_file.name)
+                for mesh in sia_file.iter_meshes():
+                    me = import_mesh(
+                        images,
+                        fm_material,
+                        sia_file,
+                        materials,
+                        mesh,
+                        use_custom_normals,
+                    )
+                    meshes.append(me)
+
+                    obj = bpy.data.objects.new(me.name, me)
+                    obj.parent = root
+
+                    collection.objects.link(obj)
+                instance_meshes[instance_key] = (meshes, sia_file.instances)
+
+        if instance_key is not None:
+            # Instanced files can hold instances of their own
+            child_instances = instance_meshes[instance_key][1]
+            if child_instances and depth >= MAX_INSTANCE_DEPTH:
+                print("Instances in {} are nested too deep".format(instance_path))
+            elif child_instances:
+                for child_instance in child_instances:
+                    load_instance(
+                        context,
+                        images,
+                        fm_material,
+                        materials,
+                        prefetcher,
+                        instance_meshes,
+                        child_instance,
+                        use_custom_normals,
+                        root,
+                        ancestors + (instance_key,),
+                        depth + 1,
+                    )
     else:
         root.name = "INSTANCE KIND {}".format(instance.kind)
+        # Every group of four positions is a quad, all in one mesh with a face
+        # per quad, in the order they're in the file.
+        positions = np.array(
+            [(position.x, position.y, position.z) for position in instance.positions],
+            np.float32,
+        ).reshape(-1, 3)
+        quads_num = len(positions) // 4
+        positions = positions[: quads_num * 4] - np.array(root.location, np.float32)
+
         me = bpy.data.meshes.new("shape")
-        bm = bmesh.new()
-        for position in instance.positions:
-            bm.verts.new(
-                (
-                    position.x - root.location.x,
-                    position.y - root.location.y,
-                    position.z - root.location.z,
-                )
-            )
-            if len(bm.verts) == 4:
-                bm.verts.ensure_lookup_table()
-                bm.faces.new((bm.verts[0], bm.verts[1], bm.verts[2], bm.verts[3]))
-                bm.faces.ensure_lookup_table()
-                me = bpy.data.meshes.new("shape")
-                bm.to_mesh(me)
-                obj = bpy.data.objects.new(me.name, me)
-                obj.parent = root
-                collection.objects.link(obj)
-                bm = bmesh.new()
+        me.vertices.add(len(positions))
+        me.vertices.foreach_set("co", positions.ravel())
+        me.loops.add(len(positions))
+        me.loops.foreach_set("vertex_index", np.arange(len(positions), dtype=np.int32))
+        me.polygons.add(quads_num)
+        me.polygons.foreach_set(
+            "loop_start", np.arange(0, len(positions), 4, dtype=np.int32)
+        )
+        me.update(calc_edges=True)
+
+        obj = bpy.data.objects.new(me.name, me)
+        obj.parent = root
+        collection.objects.link(obj)
 
     root["FM_INSTANCE_KIND"] = instance.kind
     root["FM_INSTANCE_NAME"] = instance.name
     root["FM_INSTANCE_PATH"] = instance.path
 
 
-def import_mesh(addon_preferences, fm_material, sia_file, materials, mesh):
+def import_mesh(
+    images, fm_material, sia_file, materials, mesh, use_custom_normals=True
+):
     me = bpy.data.meshes.new("{}_mesh_{}".format(sia_file.name.lower(), mesh.id))
     for material in mesh.materials:
-        setup_material(addon_preferences, fm_material, materials, me, material)
-
-    bm = bmesh.new()
-    for v in mesh.vertices:
-        bm.verts.new((v.position.x, v.position.y, v.position.z))
-    bm.verts.ensure_lookup_table()
-    for t in mesh.triangles:
-        bm.faces.new((bm.verts[t.index1], bm.verts[t.index2], bm.verts[t.index3]))
-    bm.faces.ensure_lookup_table()
-
-    bm.to_mesh(me)
-
-    for uv_index in range(0, len(mesh.vertices[0].texture_coords)):
-        uvs = []
-        uv_set = me.uv_layers.new().data
-
-        for v in mesh.vertices:
-            uvs.append(
-                (
-                    v.texture_coords[uv_index].x,
-                    (v.texture_coords[uv_index].y * -1) + 1,
-                )
-            )
+        setup_material(images, fm_material, materials, me, material)
+
+    # Filled straight from the parsed arrays, every polygon is a triangle
+    positions = mesh.arrays.positions
+    triangles = mesh.arrays.triangles
+    me.vertices.add(len(positions))
+    me.vertices.foreach_set("co", np.ascontiguousarray(positions).ravel())
+    me.loops.add(triangles.size)
+    me.loops.foreach_set("vertex_index", triangles.astype(np.int32).ravel())
+    me.polygons.add(len(triangles))
+    me.polygons.foreach_set(
+        "loop_start", np.arange(0, triangles.size, 3, dtype=np.int32)
+    )
+    me.update(calc_edges=True)
+
+    loop_vertices = np.empty(len(me.loops), np.int32)
+    me.loops.foreach_get("vertex_index", loop_vertices)
+    for uv_set in mesh.arrays.uv_sets:
+        uvs = np.array(uv_set, np.float32)
+        uvs[:, 1] = 1.0 - uvs[:, 1]
 
-        uvs = [i for poly in me.polygons for vidx in poly.vertices for i in uvs[vidx]]
-        uv_set.foreach_set("uv", uvs)
+        uv_layer = me.uv_layers.new().data
+        uv_layer.foreach_set("uv", uvs[loop_vertices].ravel())
 
     me.polygons.foreach_set("use_smooth", [True] * len(me.polygons))
 
     me.validate(clean_customdata=False)
     me.update(calc_edges=False, calc_edges_loose=False)
+
+    if use_custom_normals:
+        # Blender 4.1 always uses custom normals, 4.0 only with auto smooth on
+        if hasattr(me, "use_auto_smooth"):
+            me.use_auto_smooth = True
+        me.normals_split_custom_set_from_vertices(
+            np.ascontiguousarray(mesh.arrays.normals)
+        )
     return me
 
 
-def setup_material(addon_preferences, fm_material, materials, me, material):
-    material.name = material.name.decode("utf-8", "replace")
-    if material not in materials:
-        materials[material] = bpy.data.materials.new(material.name)
-        materials[material].FM_SHADER = material_kind_to_enum(material.kind)
-    else:
-        me.materials.append(materials[material])
+def setup_material(images, fm_material, materials, me, material):
+    material.name = data_types.text(material.name)
+    if material.key in materials:
+        me.materials.append(materials[material.key])
         return
 
-    mat = materials[material]
+    mat = bpy.data.materials.new(material.name)
+    mat.FM_SHADER = material_kind_to_enum(material.kind)
+    mat["FM_MATERIAL_KEY"] = material.key
+    materials[material.key] = mat
 
     mat.use_nodes = True
     nodes = mat.node_tree.nodes
@@ -210,24 +490,8 @@ def setup_material(addon_preferences, fm_material, materials, me, material):
 
     mat.node_tree.links.new(output_node.inputs["Surface"], node_group.outputs["BSDF"])
     for texture in material.textures:
-        texture_path = utils.absolute_asset_path(
-            addon_preferences.base_extracted_textures_path,
-            texture.path.decode("utf-8", "replace"),
-        )
-        alternative_texture_path = utils.absolute_asset_path(
-            addon_preferences.base_textures_path,
-            texture.path.decode("utf-8", "replace"),
-        )
-        texture_base = os.path.splitext(texture_path)[0]
-        alternative_texture_base = os.path.splitext(alternative_texture_path)[0]
-
-        ext = ".dds"
-        if os.path.exists(texture_base + ext):
-            texture_path = texture_base + ext
-        elif os.path.exists(alternative_texture_base + ext):
-            texture_path = alternative_texture_base + ext
-
-        if not os.path.exists(texture_path):
+        texture_path = images.find(data_types.text(texture.path))
+        if texture_path is None:
             continue
 
         if texture.kind == data_types.TextureKind.Albedo:
@@ -235,7 +499,7 @@ def setup_material(addon_preferences, fm_material, materials, me, material):
             mat.node_tree.links.new(
                 node_group.inputs["Albedo"], albedo.outputs["Color"]
             )
-            texture = bpy.data.images.load(texture_path, check_existing=True)
+            texture = images.load(texture_path)
             albedo.image = texture
         elif texture.kind == data_types.TextureKind.RoughnessMetallicAmbientOcclusion:
             ro_me_ao = nodes.new("ShaderNodeTexImage")
@@ -243,7 +507,7 @@ def setup_material(addon_preferences, fm_material, materials, me, material):
                 node_group.inputs["Roughness Metallic AO"],
                 ro_me_ao.outputs["Color"],
             )
-            texture = bpy.data.images.load(texture_path, check_existing=True)
+            texture = images.load(texture_path)
             texture.colorspace_settings.name = "Linear Rec.709"
             ro_me_ao.image = texture
         elif texture.kind == data_types.TextureKind.Normal:
@@ -256,7 +520,7 @@ def setup_material(addon_preferences, fm_material, materials, me, material):
                 node_group.inputs["Normal Alpha"],
                 normal.outputs["Alpha"],
             )
-            texture = bpy.data.images.load(texture_path, check_existing=True)
+            texture = images.load(texture_path)
             texture.colorspace_settings.name = "Non-Color"
             normal.image = texture
         elif texture.kind == data_types.TextureKind.Mask:
@@ -265,21 +529,19 @@ def setup_material(addon_preferences, fm_material, materials, me, material):
                 node_group.inputs["Mask"],
                 mask.outputs["Color"],
             )
-            texture = bpy.data.images.load(texture_path, check_existing=True)
+            texture = images.load(texture_path)
             texture.colorspace_settings.name = "Linear Rec.709"
             mask.image = texture
         elif texture.kind == data_types.TextureKind.Lightmap:
-            if materials[material].FM_SHADER == "STATIC":
-                materials[material].FM_SHADER = material_kind_to_enum(
-                    "static_lightmapped"
-                )
+            if mat.FM_SHADER == "STATIC":
+                mat.FM_SHADER = material_kind_to_enum("static_lightmapped")
 
             lightmap = nodes.new("ShaderNodeTexImage")
             mat.node_tree.links.new(
                 node_group.inputs["Lightmap"],
                 lightmap.outputs["Color"],
             )
-            texture = bpy.data.images.load(texture_path, check_existing=True)
+            texture = images.load(texture_path)
             texture.colorspace_settings.name = "Linear Rec.709"
             lightmap.image = texture
 
@@ -290,4 +552,4 @@ def setup_material(addon_preferences, fm_material, materials, me, material):
                 uv_map.outputs["UV"],
             )
 
-    me.materials.append(materials[material])
+    me.materials.append(mat)
@@ -1,4 +1,7 @@
 import os
+import posixpath
+import queue
+import threading
 
 
 def asset_path(absolute_path, base_path):
@@ -8,3 +11,124 @@ def asset_path(absolute_path, base_path):
 
 def absolute_asset_path(base_path, relative_path):
     return os.path.normpath(os.path.join(base_path, relative_path))
+
+
+def asset_key(relative_path):
+    """How a path relative to a base folder is looked up in an AssetIndex,
+    the same for every spelling of it."""
+    path = relative_path.replace("\\", "/").lower()
+    return posixpath.normpath(path).lstrip("/")
+
+
+class AssetIndex:
+    """Every file under a base folder, found with a single walk of it, so
+    looking up assets doesn't stat the disk for each one."""
+
+    def __init__(self, base_path):
+        self.base_path = base_path
+        self.files = {}
+        self.directories = {}
+        for root, _, files in os.walk(base_path):
+            try:
+                self.directories[root] = os.stat(root).st_mtime_ns
+            except OSError:
+                continue
+            for file in files:
+                path = os.path.join(root, file)
+                self.files[asset_key(os.path.relpath(path, base_path))] = path
+
+    def is_stale(self):
+        """Whether files were added or removed since it was made."""
+        if not self.directories:
+            return os.path.isdir(self.base_path)
+        for directory, mtime in self.directories.items():
+            try:
+                if os.stat(directory).st_mtime_ns != mtime:
+                    return True
+            except OSError:
+                return True
+        return False
+
+    def find(self, relative_path, extension):
+        """The absolute path of relative_path with its extension swapped for
+        extension, None if there's no such file."""
+        key = asset_key(os.path.splitext(relative_path)[0] + extension)
+        return self.files.get(key)
+
+
+# Kept between imports, and only made again when their folders change
+asset_indexes = {}
+
+
+def asset_index(base_path):
+    key = os.path.normcase(os.path.abspath(base_path))
+    index = asset_indexes.get(key)
+    if index is None or index.is_stale():
+        index = AssetIndex(base_path)
+        asset_indexes[key] = index
+    return index
+
+
+class AssetResolver:
+    """Finds assets in a list of base folders, the first ones taking
+    precedence."""
+
+    def __init__(self, base_paths):
+        self.indexes = [
+            asset_index(base_path) for base_path in base_paths if base_path != ""
+        ]
+
+    def find(self, relative_path, extensions):
+        """Tries each extension in every base folder before moving on to the
+        next one, None if it's in none of them."""
+        for extension in extensions:
+            for index in self.indexes:
+                path = index.find(relative_path, extension)
+                if path is not None:
+                    return path
+        return None
+
+
+def read_ahead(iterable, size=2):
+    """Yields the items of iterable, which is run on a worker thread so the
+    next items are being made while the caller works on this one. At most
+    size items are made ahead. Exceptions from iterable are raised here.
+
+    Close the generator when stopping early, that waits for the worker.
+    """
+    items = queue.Queue(size)
+    stop = threading.Event()
+    done = object()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+        except BaseException as e:
+            put((done, e))
+            return
+        put((done, None))
+
+    worker = threading.Thread(target=produce, daemon=True)
+    worker.start()
+    try:
+        while True:
+            item, error = items.get()
+            if item is done:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+        worker.join()
@@ -0,0 +1,167 @@
+"""Writes a small file for every combination of vertex flags and checks that
+the buffered reader decodes it the same as the original one does. Also checks
+that a bad face index is reported by every reader.
+
+    python blender_addons/tools/check_sia.py
+
+Runs without Blender, only the format code in io_scene_sia.core is used. Kept
+outside the addon so it isn't part of the zip users install.
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from io_scene_sia.core import data_types, parse_sia, write_sia
+
+VERTICES_NUM = 7
+TRIANGLES_NUM = 5
+
+
+def flag_combinations():
+    """Every VertexFlags the parser accepts, position and normal are required."""
+    names = [name for (name, _, _) in data_types.VertexLayout.fields]
+    optional = names[2:]
+    for number in range(1 << len(optional)):
+        vertex_flags = data_types.VertexFlags()
+        vertex_flags.position = True
+        vertex_flags.normal = True
+        for bit, name in enumerate(optional):
+            setattr(vertex_flags, name, bool(number & (1 << bit)))
+        yield vertex_flags
+
+
+def make_model(vertex_flags: data_types.VertexFlags, rng) -> data_types.Model:
+    layout = data_types.VertexLayout.from_flags(vertex_flags)
+    vertices = np.zeros(VERTICES_NUM, layout.dtype())
+    for name in vertices.dtype.names:
+        shape = vertices[name].shape
+        if name == "bones":
+            vertices[name] = rng.integers(0, 256, shape)
+        else:
+            vertices[name] = rng.uniform(-100, 100, shape)
+
+    mesh = data_types.Mesh()
+    mesh.vertices_num = VERTICES_NUM
+    mesh.triangles_num = TRIANGLES_NUM
+    mesh.materials.append(data_types.Material("check", "static"))
+    mesh.arrays = data_types.MeshArrays(
+        vertices, rng.integers(0, VERTICES_NUM, (TRIANGLES_NUM, 3))
+    )
+
+    model = data_types.Model()
+    model.name = "check"
+    model.vertex_flags = vertex_flags
+    model.meshes.append(mesh)
+    return model
+
+
+def mesh_values(model: data_types.Model) -> list:
+    def vector(value):
+        return tuple(
+            getattr(value, axis) for axis in ("x", "y", "z") if hasattr(value, axis)
+        )
+
+    return [
+        (
+            [
+                (
+                    vector(vertex.position),
+                    vector(vertex.normal),
+                    [vector(uv) for uv in vertex.texture_coords],
+                )
+                for vertex in mesh.vertices
+            ],
+            [
+                (triangle.index1, triangle.index2, triangle.index3)
+                for triangle in mesh.triangles
+            ],
+        )
+        for mesh in model.meshes
+    ]
+
+
+def check(vertex_flags: data_types.VertexFlags, path: str, rng) -> None | str:
+    """Returns what didn't match, or None."""
+    model = make_model(vertex_flags, rng)
+    write_sia.save(path, model)
+
+    try:
+        original = parse_sia.load(path, buffered=False)
+        buffered = parse_sia.load(path, buffered=True)
+        arrays = parse_sia.load(path, as_arrays=True)
+    except Exception as e:
+        return "{}: {}".format(type(e).__name__, e)
+
+    if mesh_values(original) != mesh_values(buffered):
+        return "buffered reader differs from the original"
+    expected = model.meshes[0].arrays
+    loaded = arrays.meshes[0].arrays
+    for name in expected.vertices.dtype.names:
+        if not np.array_equal(expected.vertices[name], loaded.vertices[name]):
+            return "{} differs when loaded as arrays".format(name)
+    if not np.array_equal(expected.triangles, loaded.triangles):
+        return "triangles differ when loaded as arrays"
+    return None
+
+
+def check_bad_index(path: str, rng) -> None | str:
+    """A face index past the mesh's vertices has to come out as a
+    SiaParseError from every reader, also the memory mapped ones."""
+    vertex_flags = data_types.VertexFlags()
+    vertex_flags.position = True
+    vertex_flags.normal = True
+    model = make_model(vertex_flags, rng)
+    model.meshes[0].arrays.triangles[-1, -1] = VERTICES_NUM
+    write_sia.save(path, model)
+
+    readers = {
+        "load": lambda: parse_sia.load(path),
+        "load as arrays": lambda: parse_sia.load(path, as_arrays=True),
+        "iter_meshes": lambda: list(parse_sia.iter_meshes(path)),
+        "iter_meshes as arrays": lambda: list(
+            parse_sia.iter_meshes(path, as_arrays=True)
+        ),
+    }
+    for name, read in readers.items():
+        try:
+            read()
+        except parse_sia.SiaParseError:
+            continue
+        except Exception as e:
+            return "{} raised {}: {}".format(name, type(e).__name__, e)
+        return "{} didn't raise".format(name)
+    return None
+
+
+def main():
+    rng = np.random.default_rng(0)
+    failures = 0
+    checked = 0
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "check.sia")
+        for vertex_flags in flag_combinations():
+            checked += 1
+            error = check(vertex_flags, path, rng)
+            if error is not None:
+                failures += 1
+                print(
+                    "FAILED {:#012b}: {}".format(vertex_flags.number(), error),
+                    file=sys.stderr,
+                )
+
+        error = check_bad_index(path, rng)
+        if error is not None:
+            failures += 1
+            print("FAILED bad face index: {}".format(error), file=sys.stderr)
+
+    print("{} vertex flag combinations, {} failed".format(checked, failures))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())